@@ -0,0 +1,95 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from calculator import DEFAULT_SOLVER, Solver
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def solve_batch(amounts: Sequence[int], scores: Sequence[int], use_numpy: Optional[bool] = None, solver: Solver = DEFAULT_SOLVER) -> Dict[str, Sequence[int]]:
+    if len(amounts) != len(scores):
+        raise ValueError(f"amounts 与 scores 长度不一致: {len(amounts)} != {len(scores)}")
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError("solve_batch(use_numpy=True) 需要安装 NumPy")
+
+    if use_numpy:
+        return solve_batch_numpy(amounts, scores, solver)
+    return solve_batch_python(amounts, scores, solver)
+
+
+def solve_batch_python(amounts: Sequence[int], scores: Sequence[int], solver: Solver = DEFAULT_SOLVER) -> Dict[str, List[int]]:
+    result = {"index": [], "C": [], "P": [], "G": []}
+    for index, (amount, target_score) in enumerate(zip(amounts, scores)):
+        for C, P, G in solver.iter(int(amount), int(target_score)):
+            result["index"].append(index)
+            result["C"].append(C)
+            result["P"].append(P)
+            result["G"].append(G)
+
+    return result
+
+
+def solve_batch_numpy(amounts: Sequence[int], scores: Sequence[int], solver: Solver = DEFAULT_SOLVER) -> Dict[str, "np.ndarray"]:
+    a1, _, a3 = solver.coefficients
+    gcd_123, gcd_12, a3_p = solver.gcd_123, solver.gcd_12, solver.a3_p
+    a1_pp, a2_pp = solver.a1_pp, solver.a2_pp
+    min_coeff, max_coeff = solver.min_coeff, solver.max_coeff
+    inv_a3_p, inv_a2_pp = solver.inv_a3_p, solver.inv_a2_pp
+
+    A = np.asarray(amounts, dtype=np.int64).ravel()
+    S = np.asarray(scores, dtype=np.int64).ravel()
+
+    # Solver.k_p_range: k' 取 [ceil((S - 0.5)A / gcd), ceil((S + 0.5)A / gcd) - 1]
+    k_min = _ceil_div((2 * S - 1) * A, 2 * gcd_123)
+    k_max = _ceil_div((2 * S + 1) * A, 2 * gcd_123) - 1
+    query, k_p = _expand(k_min, k_max - k_min + 1, 1)
+    A, S = A[query], S[query]
+
+    # Solver.c_interval: C 取同余类 C_0 (mod gcd_12) 中 [C_min, C_max] 的部分, 下界取二次不等式的正根;
+    # 浮点开方再留出一个步长的余量, 余下的少数 C 仍按 E 的范围筛选
+    b = gcd_12 * max_coeff * (A + 1) - k_p + solver.a3_p
+    C_root = np.floor((np.sqrt((b * b + 4 * solver.a3_p * k_p).astype(np.float64)) - b) / (2 * solver.a3_p)).astype(np.int64) - gcd_12
+    C_min = np.maximum(np.maximum(_ceil_div((S - a1) * A, a3), 0), C_root)
+    C_max = np.minimum(A, k_p // solver.C_max_divisor)
+    C_0 = inv_a3_p * k_p % gcd_12
+    legal_C_min = C_0 + _ceil_div(C_min - C_0, gcd_12) * gcd_12
+    row, C = _expand(legal_C_min, _progression_length(legal_C_min, C_max, gcd_12), gcd_12)
+    query, k_p, A = query[row], k_p[row], A[row]
+
+    k_pp = (k_p - a3_p * C) // gcd_12
+    E_max = (A + 1) * C // (C + 1)
+    legal = (C * min_coeff <= k_pp) & (k_pp <= E_max * max_coeff)
+    query, C, k_pp, E_max = query[legal], C[legal], k_pp[legal], E_max[legal]
+
+    # Solver.g_bounds: G 取同余类 G_0 (mod a1'') 中 [G_min, G_max] 的部分
+    G_min = np.maximum(0, _ceil_div(a1_pp * C - k_pp, solver.G_divisor))
+    G_max = np.minimum(k_pp // a2_pp, (a1_pp * E_max - k_pp) // solver.G_divisor)
+    G_0 = inv_a2_pp * k_pp % a1_pp
+    legal_G_min = G_0 + _ceil_div(G_min - G_0, a1_pp) * a1_pp
+    row, G = _expand(legal_G_min, _progression_length(legal_G_min, G_max, a1_pp), a1_pp)
+    query, C, k_pp = query[row], C[row], k_pp[row]
+
+    P = (k_pp - G * a2_pp) // a1_pp
+
+    return {"index": query, "C": C, "P": P, "G": G}
+
+
+def _ceil_div(numerator: "np.ndarray", denominator: int) -> "np.ndarray":
+    return -(-numerator // denominator)
+
+
+def _progression_length(start: "np.ndarray", stop: "np.ndarray", step: int) -> "np.ndarray":
+    return np.maximum(0, (stop - start) // step + 1)
+
+
+def _expand(starts: "np.ndarray", counts: "np.ndarray", step: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    counts = np.maximum(counts, 0)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return owner, starts[owner] + offsets * step
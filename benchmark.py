@@ -0,0 +1,148 @@
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import batch
+from calculator import solve, solve_compact, iter_solutions, count_solutions
+
+
+def solve_batch_engine(use_numpy: bool) -> Callable[[int, int], List[Tuple[int, int, int]]]:
+    # 单个查询作为只有一行的批, 把按列返回的结果转回 (C, P, G) 元组
+    def engine(amount: int, target_score: int) -> List[Tuple[int, int, int]]:
+        result = batch.solve_batch([amount], [target_score], use_numpy=use_numpy)
+        return [(int(C), int(P), int(G)) for C, P, G in zip(result["C"], result["P"], result["G"])]
+
+    return engine
+
+
+ENGINES: Dict[str, Callable[[int, int], Any]] = {
+    "solve": solve,
+    "solve_compact": solve_compact,
+    "iter_solutions": lambda amount, target_score: list(iter_solutions(amount, target_score)),
+    "count_solutions": count_solutions,
+    "solve_batch": solve_batch_engine(use_numpy=False),
+}
+if batch.np is not None:
+    ENGINES["solve_batch_numpy"] = solve_batch_engine(use_numpy=True)
+
+DEFAULT_AMOUNTS = (10, 100, 500, 1000, 2000, 5000, 10000)
+
+# 理论值 φ 附近、各评级线 (V/S/A/B/C) 附近、0 分附近
+SCORE_REGIMES: Dict[str, Sequence[int]] = {
+    "high": (1000000, 999000),
+    "mid": (960000, 920000, 880000, 820000, 700000),
+    "low": (0, 1000),
+}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def solution_count(result: Any) -> int:
+    return result if isinstance(result, int) else len(result)
+
+
+def make_scores(regime: str, samples: int, rng: random.Random) -> List[int]:
+    scores = []
+    for center in SCORE_REGIMES[regime]:
+        scores.append(center)
+        scores.extend(min(1000000, max(0, center + rng.randint(-500, 500))) for _ in range(samples - 1))
+    return scores
+
+
+def bench_case(engine: Callable[[int, int], Any], amount: int, scores: Sequence[int], repeat: int) -> Dict[str, Any]:
+    latencies = []
+    solutions = 0
+    for _ in range(repeat):
+        for target_score in scores:
+            start_time = time.perf_counter()
+            result = engine(amount, target_score)
+            latencies.append(time.perf_counter() - start_time)
+            solutions += solution_count(result)
+
+    peak_memory = 0
+    tracemalloc.start()
+    try:
+        for target_score in scores:
+            tracemalloc.reset_peak()
+            result = engine(amount, target_score)
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+            del result
+    finally:
+        tracemalloc.stop()
+
+    total_time = sum(latencies)
+    return {
+        "queries": len(latencies),
+        "solutions": solutions,
+        "total_s": total_time,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "solutions_per_s": solutions / total_time if total_time > 0 else 0.0,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run(engines: Sequence[str], amounts: Sequence[int], regimes: Sequence[str], samples: int = 5, repeat: int = 3, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    scores_by_regime = {regime: make_scores(regime, samples, rng) for regime in regimes}
+
+    results = []
+    for name in engines:
+        for amount in amounts:
+            for regime in regimes:
+                case = bench_case(ENGINES[name], amount, scores_by_regime[regime], repeat)
+                case.update(engine=name, amount=amount, regime=regime)
+                results.append(case)
+                print(
+                    f"{name:>16} A={amount:<6} {regime:<5} "
+                    f"p50={case['p50_ms']:9.3f}ms p99={case['p99_ms']:9.3f}ms "
+                    f"{case['solutions_per_s']:14.0f} 解/秒 峰值内存={case['peak_memory_bytes'] / 1024:10.1f}KiB",
+                    file=sys.stderr
+                )
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "samples": samples,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="在不同物量与分数区间上测量求解器的耗时、吞吐与峰值内存")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES), help="要测量的求解实现")
+    parser.add_argument("--amounts", type=int, nargs="+", default=list(DEFAULT_AMOUNTS), help="物量网格")
+    parser.add_argument("--regimes", nargs="+", choices=sorted(SCORE_REGIMES), default=list(SCORE_REGIMES), help="分数区间")
+    parser.add_argument("--samples", type=int, default=5, help="每个分数中心附近采样的分数个数")
+    parser.add_argument("--repeat", type=int, default=3, help="每组查询重复次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", default=None, help="JSON 结果输出路径, 默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    report = run(args.engines, args.amounts, args.regimes, samples=args.samples, repeat=args.repeat, seed=args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,152 @@
+import sys
+import array
+import sqlite3
+import threading
+import itertools
+import collections
+from typing import Callable, Dict, List, Optional, Tuple
+
+from calculator import SCORE_COEFFICIENTS, solve
+
+CACHE_FORMAT_VERSION = 1
+CONSTANTS_VERSION = f"v{CACHE_FORMAT_VERSION}:" + ",".join(str(c) for c in SCORE_COEFFICIENTS)
+
+Solutions = Tuple[Tuple[int, int, int], ...]
+
+
+def approximate_size(solutions: Solutions) -> int:
+    solution_size = sys.getsizeof((0, 0, 0)) + 3 * sys.getsizeof(1 << 20)
+    return sys.getsizeof(solutions) + len(solutions) * solution_size
+
+
+def encode_solutions(solutions: Solutions) -> bytes:
+    return array.array("I", itertools.chain.from_iterable(solutions)).tobytes()
+
+
+def decode_solutions(data: bytes) -> Solutions:
+    flat = array.array("I")
+    flat.frombytes(data)
+    columns = iter(flat)
+    return tuple(zip(columns, columns, columns))
+
+
+class SolutionCache:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 4096,
+        max_bytes: int = 64 * 1024 * 1024,
+        solver: Callable[[int, int], List[Tuple[int, int, int]]] = solve,
+        version: str = CONSTANTS_VERSION
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.solver = solver
+        self.version = version
+
+        self.entries: "collections.OrderedDict[Tuple[int, int], Tuple[Solutions, int]]" = collections.OrderedDict()
+        self.current_bytes = 0
+        self.counters = collections.Counter()
+        self.lock = threading.Lock()
+
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                "amount INTEGER NOT NULL, score INTEGER NOT NULL, version TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (amount, score, version))"
+            )
+            self.connection.commit()
+
+    def solve(self, amount: int, target_score: int) -> List[Tuple[int, int, int]]:
+        return list(self.get(amount, target_score))
+
+    def get(self, amount: int, target_score: int) -> Solutions:
+        key = (amount, target_score)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry[0]
+
+            solutions = self.load(key)
+            if solutions is not None:
+                self.counters["disk_hits"] += 1
+                self.remember(key, solutions)
+                return solutions
+
+            self.counters["misses"] += 1
+
+        solutions = tuple(self.solver(amount, target_score))
+
+        with self.lock:
+            self.store(key, solutions)
+            self.remember(key, solutions)
+
+        return solutions
+
+    def load(self, key: Tuple[int, int]) -> Optional[Solutions]:
+        if self.connection is None:
+            return None
+
+        row = self.connection.execute(
+            "SELECT data FROM solutions WHERE amount = ? AND score = ? AND version = ?", (*key, self.version)
+        ).fetchone()
+        return None if row is None else decode_solutions(row[0])
+
+    def store(self, key: Tuple[int, int], solutions: Solutions) -> None:
+        if self.connection is None:
+            return
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions (amount, score, version, data) VALUES (?, ?, ?, ?)",
+            (*key, self.version, encode_solutions(solutions))
+        )
+        self.connection.commit()
+
+    def remember(self, key: Tuple[int, int], solutions: Solutions) -> None:
+        size = approximate_size(solutions)
+        if size > self.max_bytes:
+            self.counters["oversized"] += 1
+            return
+
+        if key in self.entries:
+            self.current_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (solutions, size)
+        self.current_bytes += size
+
+        while len(self.entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "memory_hits": self.counters["memory_hits"],
+                "disk_hits": self.counters["disk_hits"],
+                "misses": self.counters["misses"],
+                "evictions": self.counters["evictions"],
+                "oversized": self.counters["oversized"],
+            }
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,8 +1,155 @@
+import os
+import sys
+import json
 import math
 import time
+import array
+import bisect
 import random
+import argparse
+import heapq
 import functools
-from typing import List, Tuple
+import itertools
+import collections
+import concurrent.futures
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+SCORE_COEFFICIENTS = (900000, int(900000 * 0.65), 100000)
+
+
+class SolutionArray:
+    def __init__(self, C: Iterable[int] = (), P: Iterable[int] = (), G: Iterable[int] = ()) -> None:
+        self.C = array.array("I", C)
+        self.P = array.array("I", P)
+        self.G = array.array("I", G)
+
+        if not len(self.C) == len(self.P) == len(self.G):
+            raise ValueError("C, P, G 三列长度不一致")
+
+    def __len__(self) -> int:
+        return len(self.C)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[int, int, int], "SolutionArray"]:
+        if isinstance(index, slice):
+            return SolutionArray(self.C[index], self.P[index], self.G[index])
+        return self.C[index], self.P[index], self.G[index]
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.C, self.P, self.G)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SolutionArray):
+            return self.C == other.C and self.P == other.P and self.G == other.G
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SolutionArray(len={len(self)})"
+
+    def columns(self) -> Tuple[array.array, array.array, array.array]:
+        return self.C, self.P, self.G
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns())
+
+    def tolist(self) -> List[Tuple[int, int, int]]:
+        return list(self)
+
+    def append(self, C: int, P: int, G: int) -> None:
+        self.C.append(C)
+        self.P.append(P)
+        self.G.append(G)
+
+    def extend(self, solutions: Iterable[Tuple[int, int, int]]) -> None:
+        for C, P, G in solutions:
+            self.append(C, P, G)
+
+    def extend_progression(self, C: int, P_start: int, P_step: int, G_start: int, G_step: int, count: int) -> None:
+        self.C.extend(itertools.repeat(C, count))
+        self.P.extend(range(P_start, P_start + P_step * count, P_step))
+        self.G.extend(range(G_start, G_start + G_step * count, G_step))
+
+
+class Constraints(NamedTuple):
+    min_combo: int = 0
+    max_combo: Optional[int] = None
+    min_good: int = 0
+    max_good: Optional[int] = None
+    full_combo: bool = False
+    all_perfect: bool = False
+
+    def bounds(self, A: int) -> Optional[Tuple[int, int, int, int]]:
+        # 转化为 C 与 G 的闭区间, 无解时返回 None; Full Combo 即 C = A, All Perfect 另有 G = 0
+        C_lo = max(self.min_combo, A if self.full_combo or self.all_perfect else 0, 0)
+        C_hi = A if self.max_combo is None else min(self.max_combo, A)
+        G_lo = max(self.min_good, 0)
+        G_hi = 0 if self.all_perfect else (A if self.max_good is None else min(self.max_good, A))
+
+        if C_lo > C_hi or G_lo > G_hi:
+            return None
+        return C_lo, C_hi, G_lo, G_hi
+
+
+NO_CONSTRAINTS = Constraints()
+
+
+def parse_constraints(fields: Dict[str, Any]) -> Constraints:
+    # 来自 JSON/CSV/查询字符串的约束: 布尔字段接受 1/true/yes, 其余字段必须是整数或整数字符串, 上限可为 null
+    values = {}
+    for key, value in fields.items():
+        if key not in Constraints._fields:
+            raise ValueError(f"未知的约束: {key}")
+        if key in ("full_combo", "all_perfect"):
+            if isinstance(value, str):
+                value = value.strip().lower() in ("1", "true", "yes")
+            elif not isinstance(value, (bool, int)):
+                raise ValueError(f"约束 {key} 必须是布尔值")
+            values[key] = bool(value)
+        elif value is None and key in ("max_combo", "max_good"):
+            values[key] = None
+        elif isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"约束 {key} 必须是整数")
+        else:
+            values[key] = int(value)
+
+    return Constraints(**values)
+
+
+class SolveStats:
+    COUNTERS = ("queries", "k_p_values", "c_scanned", "c_accepted", "g_progressions", "solutions", "combo_rejected")
+    PHASES = ("k_p", "c_scan", "g_bounds", "total")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.timings = dict.fromkeys(self.PHASES, 0.0)
+
+    def add(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.timings[phase] += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = dict(self.counters)
+        result["c_rejected"] = self.counters["c_scanned"] - self.counters["c_accepted"]
+        result.update((f"{phase}_s", seconds) for phase, seconds in self.timings.items())
+        return result
+
+    def __repr__(self) -> str:
+        return f"SolveStats({self.as_dict()})"
+
+# 排序键与遍历方向: 方向为 1 时沿 G 递增 (P 递减) 遍历每个 C 的等差数列, 为 -1 时反之, 排序键在遍历方向上单调不减
+SOLUTION_ORDERS: Dict[str, Tuple[Callable[[int, int, int], Tuple[int, int]], int]] = {
+    "most_perfect": (lambda C, P, G: (-P, -C), 1),
+    "fewest_good": (lambda C, P, G: (G, -C), 1),
+    "highest_combo": (lambda C, P, G: (-C, -P), 1),
+    "lowest_combo": (lambda C, P, G: (C, -P), 1),
+    "most_good": (lambda C, P, G: (-G, -C), -1),
+    "fewest_perfect": (lambda C, P, G: (P, -C), -1),
+}
 
 
 def get_gcd(*coefficients: int) -> int:
@@ -25,91 +172,462 @@ def mod_inv(num: int, mod: int) -> int:
     return x % mod if gcd == 1 else None
 
 
-def get_all_k_p(A: int, S: int, gcd_123: int) -> List[int]:
-    k_min = math.ceil((S - 0.5) * A / gcd_123)
-    k_max = math.ceil((S + 0.5) * A / gcd_123) - 1
+def solve(amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> List[Tuple[int, int, int]]:
+    return DEFAULT_SOLVER.solve(amount, target_score, constraints, stats, acc, acc_decimals)
 
-    all_k = [k for k in range(k_min, k_max + 1)]
-    return all_k
 
+def iter_solutions(amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> Iterator[Tuple[int, int, int]]:
+    return DEFAULT_SOLVER.iter(amount, target_score, constraints, stats, acc, acc_decimals)
 
-def get_all_c(a1_pp: int, a2_pp: int, gcd_12: int, a3_p: int, k_p: int, A: int, S: int) -> List[int]:
-    min_coeff, max_coeff = min(a1_pp, a2_pp), max(a1_pp, a2_pp)
 
-    C_min = max(math.ceil((S - 900000) * A / 100000), 0)
-    C_max = min(A, math.ceil(k_p / (gcd_12 * min_coeff + a3_p)))
+def solve_range(amount: int, score_min: int, score_max: int, constraints: Optional[Constraints] = None) -> List[Tuple[int, int, int, int]]:
+    return DEFAULT_SOLVER.solve_range(amount, score_min, score_max, constraints)
 
-    C_0 = mod_inv(a3_p, gcd_12) * k_p % gcd_12
-    legal_C_min = C_0 + math.ceil((C_min - C_0) / gcd_12) * gcd_12
 
-    all_C = []
-    for C in range(legal_C_min, C_max + 1, gcd_12):
-        k_pp = (k_p - a3_p * C) // gcd_12
+def iter_solutions_range(amount: int, score_min: int, score_max: int, constraints: Optional[Constraints] = None) -> Iterator[Tuple[int, int, int, int]]:
+    return DEFAULT_SOLVER.iter_range(amount, score_min, score_max, constraints)
 
-        E_min = C
-        E_max = math.floor((A + 1) / (C + 1) * C)
-        
-        if E_min * min_coeff <= k_pp <= E_max * max_coeff:
-            all_C.append(C)
 
-    return all_C
+def solve_compact(amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> SolutionArray:
+    return DEFAULT_SOLVER.solve_compact(amount, target_score, constraints, stats, acc, acc_decimals)
 
 
-def solve(amount: int, target_score: int) -> List[Tuple[int, int, int]]:
-    a1, a2, a3 = 900000, int(900000 * 0.65), 100000
-    A, S = amount, target_score
+def top_solutions(amount: int, target_score: int, k: int = 10, order: str = "most_perfect", constraints: Optional[Constraints] = None) -> List[Tuple[int, int, int]]:
+    return DEFAULT_SOLVER.top(amount, target_score, k, order, constraints)
 
-    a1_p, a2_p, a3_p = normalize(a1, a2, a3)
-    
-    solutions = []
-    for k_p in get_all_k_p(A, S, get_gcd(a1, a2, a3)):
-        solutions.extend(solve_diophantine_with_three_variables(a1_p, a2_p, a3_p, k_p, A, S))
 
-    return solutions
+def iter_solutions_ordered(amount: int, target_score: int, order: str = "most_perfect", constraints: Optional[Constraints] = None) -> Iterator[Tuple[int, int, int]]:
+    return DEFAULT_SOLVER.iter_ordered(amount, target_score, order, constraints)
 
 
-def solve_diophantine_with_three_variables(a1_p: int, a2_p: int, a3_p: int, k_p: int, A: int, S: int) -> List[Tuple[int, int, int]]:
-    a1_pp, a2_pp = normalize(a1_p, a2_p)
-    gcd_12 = get_gcd(a1_p, a2_p)
-    
-    solutions = []
-    for C in get_all_c(a1_pp, a2_pp, gcd_12, a3_p, k_p, A, S):
-        k_pp = (k_p - a3_p * C) // gcd_12
-        for P, G in solve_diophantine_with_two_variables(a1_pp, a2_pp, k_pp, C, A, S):
-            E = P + G
-            if A >= E >= C >= math.ceil(E / (A - E + 1)):
-                solutions.append((C, P, G))
+def sample_solutions(amount: int, target_score: int, k: int = 1, seed: Optional[int] = None, constraints: Optional[Constraints] = None) -> List[Tuple[int, int, int]]:
+    return DEFAULT_SOLVER.sample(amount, target_score, k, seed, constraints)
+
+
+def count_solutions(amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> int:
+    return DEFAULT_SOLVER.count(amount, target_score, constraints, stats, acc, acc_decimals)
+
+
+def solve_accuracy(amount: int, acc: float, acc_decimals: int = 2) -> List[Tuple[int, int]]:
+    return DEFAULT_SOLVER.solve_accuracy(amount, acc, acc_decimals)
+
+
+def iter_accuracy(amount: int, acc: float, acc_decimals: int = 2) -> Iterator[Tuple[int, int]]:
+    return DEFAULT_SOLVER.iter_accuracy(amount, acc, acc_decimals)
+
+
+def score_table(amount: int) -> List[int]:
+    return DEFAULT_SOLVER.score_table(amount)
+
+
+class Solver:
+    def __init__(self, coefficients: Tuple[int, int, int] = SCORE_COEFFICIENTS) -> None:
+        a1, a2, a3 = coefficients
+        self.coefficients = (a1, a2, a3)
+        self.max_score = a1 + a3
+
+        self.gcd_123 = get_gcd(a1, a2, a3)
+        self.a1_p, self.a2_p, self.a3_p = normalize(a1, a2, a3)
+        self.gcd_12 = get_gcd(self.a1_p, self.a2_p)
+        self.a1_pp, self.a2_pp = normalize(self.a1_p, self.a2_p)
+        self.min_coeff, self.max_coeff = min(self.a1_pp, self.a2_pp), max(self.a1_pp, self.a2_pp)
 
-    return solutions
+        self.inv_a3_p = mod_inv(self.a3_p, self.gcd_12)
+        self.inv_a2_pp = mod_inv(self.a2_pp, self.a1_pp)
+        self.C_max_divisor = self.gcd_12 * self.min_coeff + self.a3_p
+        self.G_divisor = self.a1_pp - self.a2_pp
+
+    def solve(self, amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> List[Tuple[int, int, int]]:
+        return list(self.iter(amount, target_score, constraints, stats, acc, acc_decimals))
+
+    def iter(self, amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> Iterator[Tuple[int, int, int]]:
+        A, S = amount, target_score
+        a1_pp, a2_pp = self.a1_pp, self.a2_pp
+
+        bounds = (constraints or NO_CONSTRAINTS).bounds(A)
+        k_pp_window = None if acc is None else self.k_pp_window(A, acc, acc_decimals)
+        for C, k_pp, legal_G_min, count in self.iter_progressions(A, S, bounds, k_pp_window, stats):
+            for G in range(legal_G_min, legal_G_min + count * a1_pp, a1_pp):
+                yield C, (k_pp - G * a2_pp) // a1_pp, G
+
+    def solve_range(self, amount: int, score_min: int, score_max: int, constraints: Optional[Constraints] = None) -> List[Tuple[int, int, int, int]]:
+        return list(self.iter_range(amount, score_min, score_max, constraints))
+
+    def iter_range(self, amount: int, score_min: int, score_max: int, constraints: Optional[Constraints] = None) -> Iterator[Tuple[int, int, int, int]]:
+        A = amount
+        a1_pp, a2_pp, a3_p, gcd_12 = self.a1_pp, self.a2_pp, self.a3_p, self.gcd_12
+        double_gcd, double_A = 2 * self.gcd_123, 2 * A
+
+        # 整个分数区间对应一段连续的 k', C 的下界取区间最低分即可对所有 k' 成立
+        bounds = (constraints or NO_CONSTRAINTS).bounds(A)
+        k_p_range = self.k_p_range(A, score_min, score_max)
+        for C, k_pp, legal_G_min, count in self.iter_progressions(A, score_min, bounds, k_p_range=k_p_range):
+            S = (double_gcd * (a3_p * C + gcd_12 * k_pp) + A) // double_A
+            for G in range(legal_G_min, legal_G_min + count * a1_pp, a1_pp):
+                yield C, (k_pp - G * a2_pp) // a1_pp, G, S
+
+    def solve_compact(self, amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> SolutionArray:
+        A, S = amount, target_score
+        a1_pp, a2_pp = self.a1_pp, self.a2_pp
+
+        solutions = SolutionArray()
+        bounds = (constraints or NO_CONSTRAINTS).bounds(A)
+        k_pp_window = None if acc is None else self.k_pp_window(A, acc, acc_decimals)
+        for C, k_pp, legal_G_min, count in self.iter_progressions(A, S, bounds, k_pp_window, stats):
+            solutions.extend_progression(C, (k_pp - legal_G_min * a2_pp) // a1_pp, -a2_pp, legal_G_min, a1_pp, count)
+
+        return solutions
+
+    def count(self, amount: int, target_score: int, constraints: Optional[Constraints] = None, stats: Optional[SolveStats] = None, acc: Optional[float] = None, acc_decimals: int = 2) -> int:
+        bounds = (constraints or NO_CONSTRAINTS).bounds(amount)
+        k_pp_window = None if acc is None else self.k_pp_window(amount, acc, acc_decimals)
+        return sum(count for *_, count in self.iter_progressions(amount, target_score, bounds, k_pp_window, stats))
+
+    def top(self, amount: int, target_score: int, k: int = 10, order: str = "most_perfect", constraints: Optional[Constraints] = None) -> List[Tuple[int, int, int]]:
+        return list(itertools.islice(self.iter_ordered(amount, target_score, order, constraints), k))
+
+    def iter_ordered(self, amount: int, target_score: int, order: str = "most_perfect", constraints: Optional[Constraints] = None) -> Iterator[Tuple[int, int, int]]:
+        if order not in SOLUTION_ORDERS:
+            raise ValueError(f"未知的排序方式: {order}")
+        key, direction = SOLUTION_ORDERS[order]
+
+        A, S = amount, target_score
+        a1_pp, a2_pp = self.a1_pp, self.a2_pp
+
+        # 每个 C 的等差数列各自有序, 用堆做多路归并, 每产出一个解只需 O(log #C)
+        heap = []
+        for C, k_pp, legal_G_min, count in self.iter_progressions(A, S, (constraints or NO_CONSTRAINTS).bounds(A)):
+            G_last = legal_G_min + (count - 1) * a1_pp
+            G, G_stop = (legal_G_min, G_last) if direction > 0 else (G_last, legal_G_min)
+            heap.append((key(C, (k_pp - G * a2_pp) // a1_pp, G), C, k_pp, G, G_stop))
+        heapq.heapify(heap)
+
+        G_step = direction * a1_pp
+        while heap:
+            _, C, k_pp, G, G_stop = heap[0]
+            yield C, (k_pp - G * a2_pp) // a1_pp, G
+
+            if G == G_stop:
+                heapq.heappop(heap)
+            else:
+                G += G_step
+                heapq.heapreplace(heap, (key(C, (k_pp - G * a2_pp) // a1_pp, G), C, k_pp, G, G_stop))
+
+    def sample(self, amount: int, target_score: int, k: int = 1, seed: Optional[int] = None, constraints: Optional[Constraints] = None) -> List[Tuple[int, int, int]]:
+        A, S = amount, target_score
+        a1_pp, a2_pp = self.a1_pp, self.a2_pp
+
+        # 每个 C 对应一段 G 的等差数列, 记录其起点与累计长度, 按排名二分定位后直接还原出解
+        progressions = []
+        cumulative = []
+        total = 0
+        for C, k_pp, legal_G_min, count in self.iter_progressions(A, S, (constraints or NO_CONSTRAINTS).bounds(A)):
+            total += count
+            progressions.append((C, k_pp, legal_G_min))
+            cumulative.append(total)
+
+        rng = random.Random(seed)
+        samples = []
+        for rank in rng.sample(range(total), min(k, total)):
+            index = bisect.bisect_right(cumulative, rank)
+            C, k_pp, legal_G_min = progressions[index]
+            G = legal_G_min + (rank - (cumulative[index - 1] if index else 0)) * a1_pp
+            samples.append((C, (k_pp - G * a2_pp) // a1_pp, G))
+
+        return samples
+
+    def solve_accuracy(self, amount: int, acc: float, acc_decimals: int = 2) -> List[Tuple[int, int]]:
+        return list(self.iter_accuracy(amount, acc, acc_decimals))
+
+    def iter_accuracy(self, amount: int, acc: float, acc_decimals: int = 2) -> Iterator[Tuple[int, int]]:
+        A = amount
+        a1_pp, a2_pp = self.a1_pp, self.a2_pp
+
+        # 只由准确率反推判定部分 (P, G); 任意 E = P + G <= A 都存在合法的最大连击, 故 G 只需满足 E <= A
+        k_pp_lo, k_pp_hi = self.k_pp_window(A, acc, acc_decimals)
+        for k_pp in range(max(k_pp_lo, 0), k_pp_hi + 1):
+            G_max = min(k_pp // a2_pp, (a1_pp * A - k_pp) // self.G_divisor)
+            for G in range(self.inv_a2_pp * k_pp % a1_pp, G_max + 1, a1_pp):
+                yield (k_pp - G * a2_pp) // a1_pp, G
+
+    def k_pp_window(self, A: int, acc: float, acc_decimals: int = 2) -> Tuple[int, int]:
+        # 准确率 (P + 0.65G) / A = k'' / (a1'' A), 显示为保留 acc_decimals 位小数的百分数并四舍五入 (0.5 进位)
+        # 显示值 N / 10^d 对应 k'' 取 [ceil((2N - 1) a1'' A / (2 * 10^(d+2))), ceil((2N + 1) a1'' A / (2 * 10^(d+2))) - 1]
+        if not 0 <= acc <= 100:
+            raise ValueError(f"准确率必须在 0 到 100 之间: {acc}")
+        N = round(acc * 10 ** acc_decimals)
+        scale = 2 * 10 ** (acc_decimals + 2)
+        return -((1 - 2 * N) * self.a1_pp * A // scale), -((-1 - 2 * N) * self.a1_pp * A // scale) - 1
+
+    def k_p_range(self, A: int, S: int, S_max: Optional[int] = None) -> range:
+        # k' 取 [ceil((S - 0.5)A / gcd), ceil((S_max + 0.5)A / gcd) - 1], 单个分数时 S_max = S
+        S_max = S if S_max is None else S_max
+        return range(-((1 - 2 * S) * A // (2 * self.gcd_123)), -((-1 - 2 * S_max) * A // (2 * self.gcd_123)))
+
+    def iter_progressions(self, A: int, S: int, bounds: Optional[Tuple[int, int, int, int]], k_pp_window: Optional[Tuple[int, int]] = None, stats: Optional[SolveStats] = None, k_p_range: Optional[range] = None) -> Iterator[Tuple[int, int, int, int]]:
+        # 全部求解路径共用的枚举 k' -> C -> G, 产出每个非空的等差数列 (C, k'', 首个 G, 项数), 公差为 a1''
+        # 传入 stats 时额外记录各阶段耗时与搜索空间大小, 每个 k' 的数列先收集再产出, 计时不包含调用方的耗时
+        a1_pp, a2_pp, a3_p, gcd_12, G_divisor = self.a1_pp, self.a2_pp, self.a3_p, self.gcd_12, self.G_divisor
+        g_bounds = self.g_bounds
+        clock = time.perf_counter
+        if stats is not None:
+            query_start = clock()
+            stats.add("queries")
+
+        try:
+            if bounds is None:
+                return
+            C_lo, C_hi, G_lo, G_hi = bounds
+
+            start_time = clock() if stats is not None else 0.0
+            if k_p_range is None:
+                k_p_range = self.k_p_range(A, S)
+            if stats is not None:
+                stats.add("k_p_values", len(k_p_range))
+                stats.add_time("k_p", clock() - start_time)
+
+            for k_p in k_p_range:
+                if stats is None:
+                    interval = self.c_interval(k_p, A, S, C_lo, C_hi, k_pp_window)
+                else:
+                    # c_scanned 为逐个检查时需要扫描的 C 个数, c_accepted 为解析求出的可行区间长度
+                    start_time = clock()
+                    scan = self.c_scan_range(k_p, A, S, C_lo, C_hi, k_pp_window)
+                    interval = self.c_interval(k_p, A, S, scan=scan)
+                    stats.add("c_scanned", len(scan))
+                    stats.add("c_accepted", len(interval))
+                    stats.add_time("c_scan", clock() - start_time)
+                    start_time = clock()
+
+                progressions = []
+                for C in interval:
+                    k_pp = (k_p - a3_p * C) // gcd_12
+                    legal_G_min, G_max = g_bounds(k_pp, C, A, G_lo, G_hi)
+                    count = max(0, (G_max - legal_G_min) // a1_pp + 1)
+                    if stats is not None:
+                        # 连击约束把 G 的上界从 E <= A 收紧到 E <= E_max, 两者之差即被连击条件排除的解
+                        free_G_max = min(G_hi, k_pp // a2_pp, (a1_pp * A - k_pp) // G_divisor)
+                        stats.add("combo_rejected", max(0, (free_G_max - legal_G_min) // a1_pp + 1) - count)
+                    if count:
+                        progressions.append((C, k_pp, legal_G_min, count))
+
+                if stats is not None:
+                    stats.add("g_progressions", len(progressions))
+                    stats.add("solutions", sum(count for *_, count in progressions))
+                    stats.add_time("g_bounds", clock() - start_time)
+                yield from progressions
+        finally:
+            if stats is not None:
+                stats.add_time("total", clock() - query_start)
+
+    def c_scan_range(self, k_p: int, A: int, S: int, C_lo: int = 0, C_hi: Optional[int] = None, k_pp_window: Optional[Tuple[int, int]] = None) -> range:
+        # 只由分数、约束与 E_min 条件得到的 C 范围, 即逐个检查 E_max 条件时需要扫描的部分
+        a1, _, a3 = self.coefficients
+        a3_p, gcd_12 = self.a3_p, self.gcd_12
+
+        if k_pp_window is not None:
+            # k'' = (k' - a3' C) / gcd_12 随 C 递减, k'' 的窗口直接换算成 C 的区间
+            k_pp_lo, k_pp_hi = k_pp_window
+            C_lo = max(C_lo, -((gcd_12 * k_pp_hi - k_p) // a3_p))
+            C_hi = (k_p - gcd_12 * k_pp_lo) // a3_p if C_hi is None else min(C_hi, (k_p - gcd_12 * k_pp_lo) // a3_p)
+
+        # E_min * min_coeff <= k'' 即 C <= k' / (gcd_12 * min_coeff + a3')
+        C_min = max(-((a1 - S) * A // a3), C_lo)
+        C_max = min(A if C_hi is None else C_hi, k_p // self.C_max_divisor)
+
+        C_0 = self.inv_a3_p * k_p % gcd_12
+        return range(C_0 - (C_0 - C_min) // gcd_12 * gcd_12, C_max + 1, gcd_12)
+
+    def c_interval(self, k_p: int, A: int, S: int, C_lo: int = 0, C_hi: Optional[int] = None, k_pp_window: Optional[Tuple[int, int]] = None, scan: Optional[range] = None) -> range:
+        a3_p, gcd_12, max_coeff = self.a3_p, self.gcd_12, self.max_coeff
+        if scan is None:
+            scan = self.c_scan_range(k_p, A, S, C_lo, C_hi, k_pp_window)
+
+        # E_max * max_coeff >= k'' 的左边随 C 单调不减、右边单调递减, 可行的 C 为一段后缀; 去掉取整后是关于 C 的二次不等式
+        # a3' C^2 + (gcd_12 * max_coeff * (A + 1) - k' + a3') C - k' >= 0, 其正根是后缀起点的下界
+        # 代价只与可行 C 的个数有关, 不再随 A 线性增长
+        b = gcd_12 * max_coeff * (A + 1) - k_p + a3_p
+        C_root = (math.isqrt(b * b + 4 * a3_p * k_p) - b) // (2 * a3_p)
+        legal_C_min = scan.start if C_root <= scan.start else scan.start - (scan.start - C_root) // gcd_12 * gcd_12
+
+        # 去掉取整只放宽了条件, 从下界起至多再前进几步即进入可行后缀
+        while legal_C_min < scan.stop and (A + 1) * legal_C_min // (legal_C_min + 1) * max_coeff < (k_p - a3_p * legal_C_min) // gcd_12:
+            legal_C_min += gcd_12
+
+        return range(legal_C_min, scan.stop, gcd_12)
+
+    def g_bounds(self, k_pp: int, C: int, A: int, G_lo: int = 0, G_hi: Optional[int] = None) -> Tuple[int, int]:
+        a1_pp, a2_pp = self.a1_pp, self.a2_pp
+        E_max = (A + 1) * C // (C + 1)
+
+        G_min = max(G_lo, -((k_pp - a1_pp * C) // self.G_divisor))
+        G_max = min(k_pp // a2_pp, (a1_pp * E_max - k_pp) // self.G_divisor)
+        if G_hi is not None:
+            G_max = min(G_max, G_hi)
+
+        G_0 = self.inv_a2_pp * k_pp % a1_pp
+        legal_G_min = G_0 - (G_0 - G_min) // a1_pp * a1_pp
+
+        return legal_G_min, G_max
+
+    def score_table(self, amount: int) -> List[int]:
+        A = amount
+        a1_p, a2_p, a3_p = self.a1_p, self.a2_p, self.a3_p
+
+        # k' = a1' P + a2' G + a3' C = a2' E + (a1' - a2') P + a3' C, P 取 [0, E], C 取 [ceil(E / (A - E + 1)), E]
+        # 对每个 E 在二维差分数组上标记一个矩形, 再沿两个步长各做一次前缀和, 即得每个 k' 的解数
+        step_P = a1_p - a2_p
+        k_p_counts = [0] * ((a1_p + a3_p) * A + step_P + a3_p + 1)
+        for E in range(A + 1):
+            C_min = -(-E // (A - E + 1))
+            base = a2_p * E + a3_p * C_min
+            P_span = step_P * (E + 1)
+            C_span = a3_p * (E - C_min + 1)
+
+            k_p_counts[base] += 1
+            k_p_counts[base + P_span] -= 1
+            k_p_counts[base + C_span] -= 1
+            k_p_counts[base + P_span + C_span] += 1
+
+        for step in (a3_p, step_P):
+            for offset in range(step):
+                k_p_counts[offset::step] = itertools.accumulate(k_p_counts[offset::step])
+
+        counts = [0] * (self.max_score + 1)
+        for k_p, count in enumerate(k_p_counts):
+            if count:
+                counts[(2 * self.gcd_123 * k_p + A) // (2 * A)] += count
+
+        return counts
+
+
+DEFAULT_SOLVER = Solver()
+
+
+# 以下保留最初的逐步求解接口, 内部全部交给 DEFAULT_SOLVER, 只支持默认计分系数
+def check_default_coefficients(given: Tuple[int, ...], expected: Tuple[int, ...]) -> None:
+    if given != expected:
+        raise ValueError(f"系数 {given} 与默认计分系数 {expected} 不一致, 其他系数请使用 Solver")
+
+
+def get_all_k_p(A: int, S: int, gcd_123: int) -> range:
+    check_default_coefficients((gcd_123,), (DEFAULT_SOLVER.gcd_123,))
+    return DEFAULT_SOLVER.k_p_range(A, S)
+
+
+def get_all_c(a1_pp: int, a2_pp: int, gcd_12: int, a3_p: int, k_p: int, A: int, S: int) -> List[int]:
+    check_default_coefficients((a1_pp, a2_pp, gcd_12, a3_p), (DEFAULT_SOLVER.a1_pp, DEFAULT_SOLVER.a2_pp, DEFAULT_SOLVER.gcd_12, DEFAULT_SOLVER.a3_p))
+    return list(DEFAULT_SOLVER.c_interval(k_p, A, S))
+
+
+def solve_diophantine_with_three_variables(a1_p: int, a2_p: int, a3_p: int, k_p: int, A: int, S: int) -> List[Tuple[int, int, int]]:
+    check_default_coefficients((a1_p, a2_p, a3_p), (DEFAULT_SOLVER.a1_p, DEFAULT_SOLVER.a2_p, DEFAULT_SOLVER.a3_p))
+    a1_pp, a2_pp = DEFAULT_SOLVER.a1_pp, DEFAULT_SOLVER.a2_pp
+    return [
+        (C, (k_pp - G * a2_pp) // a1_pp, G)
+        for C, k_pp, legal_G_min, count in DEFAULT_SOLVER.iter_progressions(A, S, NO_CONSTRAINTS.bounds(A), k_p_range=range(k_p, k_p + 1))
+        for G in range(legal_G_min, legal_G_min + count * a1_pp, a1_pp)
+    ]
 
 
 def solve_diophantine_with_two_variables(a1_pp: int, a2_pp: int, k_pp: int, C: int, A: int, S: int) -> List[Tuple[int, int]]:
-    G_min = max(0, math.ceil((a1_pp - k_pp) / (a1_pp - a2_pp)))
-    G_max = min(math.floor(k_pp / a2_pp), math.floor((a1_pp * math.floor((A + 1) * C / (C + 1)) - k_pp) / (a1_pp - a2_pp)))
+    check_default_coefficients((a1_pp, a2_pp), (DEFAULT_SOLVER.a1_pp, DEFAULT_SOLVER.a2_pp))
+    legal_G_min, G_max = DEFAULT_SOLVER.g_bounds(k_pp, C, A)
+    return [((k_pp - G * a2_pp) // a1_pp, G) for G in range(legal_G_min, G_max + 1, a1_pp)]
 
-    G_0 = mod_inv(a2_pp, a1_pp) * k_pp % a1_pp
-    legal_G_min = G_0 + math.ceil((G_min - G_0) / a1_pp) * a1_pp
 
-    solutions = []
-    for G in range(legal_G_min, G_max + 1, a1_pp):
-        P = (k_pp - G * a2_pp) // a1_pp
-        solutions.append((P, G))
+def sweep(amounts: Iterable[int], scores: Sequence[int], output_path: str, mode: str = "count", workers: Optional[int] = None, chunk_size: int = 100) -> int:
+    if mode not in ("count", "solutions"):
+        raise ValueError(f"未知的 sweep 模式: {mode}")
 
-    return solutions
+    workers = workers or os.cpu_count() or 1
+    task = functools.partial(sweep_chunk, scores=list(scores), mode=mode)
 
+    records = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor, open(output_path, "w", encoding="utf-8") as output:
+        for lines in ordered_map(executor, task, chunked(amounts, chunk_size), window=2 * workers):
+            output.writelines(lines)
+            output.flush()
+            records += len(lines)
 
-if __name__ == '__main__':
+    return records
+
+
+def sweep_chunk(amounts: List[int], scores: List[int], mode: str) -> List[str]:
+    lines = []
+    for amount in amounts:
+        for target_score in scores:
+            record: Dict[str, Any] = {"amount": amount, "score": target_score}
+            if mode == "solutions":
+                solutions = solve(amount, target_score)
+                record["count"] = len(solutions)
+                record["solutions"] = solutions
+            else:
+                record["count"] = count_solutions(amount, target_score)
+            lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+
+    return lines
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def ordered_map(executor: concurrent.futures.Executor, fn: Callable, iterable: Iterable, window: int) -> Iterator:
+    pending = collections.deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def sweep_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="calculator.py sweep", description="对一段物量范围批量求解并写入 JSON Lines 数据集")
+    parser.add_argument("--amount-start", type=int, default=1, help="起始物量 (含)")
+    parser.add_argument("--amount-stop", type=int, required=True, help="结束物量 (含)")
+    parser.add_argument("--scores", type=int, nargs="+", required=True, help="要求解的目标分数")
+    parser.add_argument("--output", required=True, help="输出文件路径")
+    parser.add_argument("--mode", choices=("count", "solutions"), default="count", help="只计数或输出全部解")
+    parser.add_argument("--workers", type=int, default=None, help="进程数, 默认为 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=100, help="每个任务包含的物量个数")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    records = sweep(
+        range(args.amount_start, args.amount_stop + 1), args.scores, args.output,
+        mode=args.mode, workers=args.workers, chunk_size=args.chunk_size
+    )
+    elapsed_time = time.perf_counter() - start_time
+
+    print(f"用时: {elapsed_time} 秒")
+    print(f"写入记录数: {records}")
+
+
+def interactive_main() -> None:
     amount = int(input("输入物量: "))
     target_score = int(input("输入目标分数: "))
 
     start_time = time.perf_counter()
-    solutions = solve(amount, target_score)
+    count = count_solutions(amount, target_score)
     elapsed_time = time.perf_counter() - start_time
 
     print(f"用时: {elapsed_time} 秒")
 
-    if solutions:
-        print(f"解的数量: {len(solutions)}")
-        print(f"随机的一组解(最大连击, Perfect, Good): {random.choice(solutions)}")
+    if count:
+        solution = sample_solutions(amount, target_score)[0]
+        print(f"解的数量: {count}")
+        print(f"随机的一组解(最大连击, Perfect, Good): {solution}")
     else:
         print("无解")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ["sweep"]:
+        sweep_main(sys.argv[2:])
+    else:
+        interactive_main()
@@ -0,0 +1,275 @@
+import sys
+import json
+import time
+import random
+import argparse
+import functools
+import itertools
+import collections
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, Tuple
+
+from benchmark import ENGINES
+from calculator import SOLUTION_ORDERS, Constraints, count_solutions, sample_solutions, score_table, solve, solve_accuracy, solve_range, top_solutions
+from scorer import calculate_accuracy
+from scorer import calculate_score as oracle_score
+
+Solution = Tuple[int, int, int]
+
+# (物量, 分数) -> 失败详情, 通过时为 None
+Check = Callable[[int, int], Optional[Dict[str, Any]]]
+
+
+def iter_legal_hits(A: int) -> Iterator[Solution]:
+    for E in range(A + 1):
+        for C in range(E + 1):
+            if C * (A - E + 1) < E:
+                continue
+            for G in range(E + 1):
+                yield C, E - G, G
+
+
+# 暴力枚举一个物量下的全部合法成绩, 按分数分组; 同一物量的所有检查与缩小反例都复用这一次枚举
+@functools.lru_cache(maxsize=64)
+def oracle_table(amount: int) -> Tuple[Dict[int, FrozenSet[Solution]], float]:
+    start_time = time.perf_counter()
+    table: Dict[int, Set[Solution]] = collections.defaultdict(set)
+    for C, P, G in iter_legal_hits(amount):
+        table[oracle_score(C, P, G, amount)].add((C, P, G))
+    return {score: frozenset(solutions) for score, solutions in table.items()}, time.perf_counter() - start_time
+
+
+def oracle_solve(amount: int, target_score: int) -> FrozenSet[Solution]:
+    return oracle_table(amount)[0].get(target_score, frozenset())
+
+
+def random_legal_hit(A: int, rng: random.Random) -> Solution:
+    E = rng.randint(0, A)
+    C = rng.randint(-(-E // (A - E + 1)), E)
+    G = rng.randint(0, E)
+    return C, E - G, G
+
+
+def compare_solutions(result: Any, expected: FrozenSet[Solution]) -> Optional[Dict[str, Any]]:
+    if isinstance(result, int):
+        return None if result == len(expected) else {"count": result, "expected_count": len(expected)}
+
+    solutions = [tuple(solution) for solution in result]
+    got = set(solutions)
+    if got == expected and len(got) == len(solutions):
+        return None
+
+    return {
+        "missing": sorted(expected - got),
+        "extra": sorted(got - expected),
+        "duplicates": len(solutions) - len(got),
+    }
+
+
+def engine_check(engine: Callable[[int, int], Any]) -> Check:
+    # (物量, 分数) -> 解集或解的个数 的求解实现, 与暴力枚举的解集比较
+    def check(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+        return compare_solutions(engine(amount, target_score), oracle_solve(amount, target_score))
+
+    return check
+
+
+def check_constraints(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+    # 约束由用例本身确定性地生成, 缩小反例时同一用例得到同一组约束
+    rng = random.Random(amount * 1000003 + target_score)
+    constraints = Constraints(
+        min_combo=rng.choice((0, rng.randint(0, amount))),
+        max_combo=rng.choice((None, rng.randint(0, amount))),
+        min_good=rng.choice((0, rng.randint(0, amount))),
+        max_good=rng.choice((None, 0, rng.randint(0, amount))),
+        full_combo=rng.random() < 0.2,
+        all_perfect=rng.random() < 0.1,
+    )
+    C_lo, C_hi, G_lo, G_hi = constraints.bounds(amount) or (1, 0, 1, 0)
+    expected = frozenset((C, P, G) for C, P, G in oracle_solve(amount, target_score) if C_lo <= C <= C_hi and G_lo <= G <= G_hi)
+
+    for name, result in (("solve", solve(amount, target_score, constraints)), ("count_solutions", count_solutions(amount, target_score, constraints))):
+        failure = compare_solutions(result, expected)
+        if failure is not None:
+            return dict(failure, path=name, constraints=constraints._asdict())
+    return None
+
+
+def check_solve_range(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+    score_max = min(target_score + 2000, 1000000)
+    table = oracle_table(amount)[0]
+    expected = frozenset((C, P, G, S) for S in range(target_score, score_max + 1) for C, P, G in table.get(S, ()))
+    return compare_solutions(solve_range(amount, target_score, score_max), expected)
+
+
+def check_top_solutions(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+    # 取全部解时应与解集相同且按排序键不减; 只取前 k 个时应是全部解的前缀
+    expected = oracle_solve(amount, target_score)
+    for order, (key, _) in SOLUTION_ORDERS.items():
+        ordered = top_solutions(amount, target_score, k=len(expected) + 1, order=order)
+        failure = compare_solutions(ordered, expected)
+        if failure is None and any(key(*a) > key(*b) for a, b in zip(ordered, ordered[1:])):
+            failure = {"unsorted": True}
+        if failure is None and top_solutions(amount, target_score, k=3, order=order) != ordered[:3]:
+            failure = {"prefix": top_solutions(amount, target_score, k=3, order=order), "expected_prefix": ordered[:3]}
+        if failure is not None:
+            return dict(failure, order=order)
+    return None
+
+
+def check_sample_solutions(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+    expected = oracle_solve(amount, target_score)
+    samples = sample_solutions(amount, target_score, k=5, seed=amount + target_score)
+    if len(samples) != min(5, len(expected)) or len(set(samples)) != len(samples) or not set(samples) <= expected:
+        return {"sample": samples, "expected_count": len(expected)}
+    return None
+
+
+def check_accuracy(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+    # 取某个解显示的准确率, 检查分数与准确率的联合查询, 以及只按准确率反推 (P, G)
+    expected = oracle_solve(amount, target_score)
+    if not expected:
+        return None
+    _, P, G = min(expected)
+    acc = calculate_accuracy(P, G, amount)
+
+    joint = frozenset(solution for solution in expected if calculate_accuracy(solution[1], solution[2], amount) == acc)
+    failure = compare_solutions(solve(amount, target_score, acc=acc), joint) or compare_solutions(count_solutions(amount, target_score, acc=acc), joint)
+    if failure is not None:
+        return dict(failure, acc=acc)
+
+    judged = frozenset((P, G) for E in range(amount + 1) for G in range(E + 1) for P in (E - G,) if calculate_accuracy(P, G, amount) == acc)
+    failure = compare_solutions(solve_accuracy(amount, acc), judged)
+    return None if failure is None else dict(failure, acc=acc, path="solve_accuracy")
+
+
+# 分数表每次都要扫过全部 k', 同一物量只计算一次并整表与暴力枚举比较, 之后每个用例只查它的分数
+@functools.lru_cache(maxsize=64)
+def score_table_mismatches(amount: int) -> Tuple[List[int], List[Tuple[int, int, int]]]:
+    table = oracle_table(amount)[0]
+    counts = score_table(amount)
+    wrong = [(S, counts[S], len(solutions)) for S, solutions in sorted(table.items()) if counts[S] != len(solutions)]
+    # 各项非负, 暴力枚举出现过的分数全部对上且总数相同时, 其余分数必然为 0
+    if not wrong and sum(counts) != sum(map(len, table.values())):
+        wrong = [(S, count, 0) for S, count in enumerate(counts) if count and S not in table]
+    return counts, wrong[:10]
+
+
+def check_score_table(amount: int, target_score: int) -> Optional[Dict[str, Any]]:
+    counts, wrong = score_table_mismatches(amount)
+    if wrong or counts[target_score] != len(oracle_solve(amount, target_score)):
+        return {"count": counts[target_score], "wrong_counts": [dict(zip(("score", "count", "expected_count"), item)) for item in wrong]}
+    return None
+
+
+# 不能表示为 (物量, 分数) -> 解集 的接口, 各自与暴力枚举比较
+CHECKS: Dict[str, Check] = {
+    "constraints": check_constraints,
+    "solve_range": check_solve_range,
+    "top_solutions": check_top_solutions,
+    "sample_solutions": check_sample_solutions,
+    "accuracy": check_accuracy,
+    "score_table": check_score_table,
+}
+
+
+def all_checks() -> Dict[str, Check]:
+    return dict({name: engine_check(engine) for name, engine in ENGINES.items()}, **CHECKS)
+
+
+def shrink_candidates(value: int, target: int) -> Iterator[int]:
+    distance = value - target
+    while distance:
+        yield value - distance
+        distance = int(distance / 2)
+
+
+def shrink(check: Check, amount: int, target_score: int) -> Tuple[int, int]:
+    def fails(A: int, S: int) -> bool:
+        return A >= 1 and check(A, S) is not None
+
+    improved = True
+    while improved:
+        improved = False
+        for A in shrink_candidates(amount, 1):
+            if fails(A, target_score):
+                amount, improved = A, True
+                break
+        for S in shrink_candidates(target_score, 0):
+            if fails(amount, S):
+                target_score, improved = S, True
+                break
+
+    return amount, target_score
+
+
+def fuzz(engines: Sequence[str], iterations: int = 200, max_amount: int = 40, seed: int = 0) -> Dict[str, Any]:
+    checks = all_checks()
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(iterations):
+        amount = rng.randint(1, max_amount)
+        if rng.random() < 0.75:
+            target_score = oracle_score(*random_legal_hit(amount, rng), amount)
+        else:
+            target_score = rng.randint(0, 1000000)
+        cases.append((amount, target_score))
+
+    report: Dict[str, Any] = {"seed": seed, "iterations": iterations, "max_amount": max_amount, "engines": {}}
+    for name in engines:
+        check = checks[name]
+        failures: List[Dict[str, Any]] = []
+        engine_total, oracle_total = 0.0, 0.0
+
+        for amount, target_score in cases:
+            # 暴力枚举按物量缓存, 只计时一次; 加速比仍按每个用例各做一次暴力枚举计算
+            oracle_total += oracle_table(amount)[1]
+            start_time = time.perf_counter()
+            failure = check(amount, target_score)
+            engine_total += time.perf_counter() - start_time
+            if failure is not None:
+                failure.update(amount=amount, score=target_score)
+                failure["shrunk"] = dict(zip(("amount", "score"), shrink(check, amount, target_score)))
+                failures.append(failure)
+
+        report["engines"][name] = {
+            "failures": failures,
+            "engine_s": engine_total,
+            "oracle_s": oracle_total,
+            "speed_ratio": oracle_total / engine_total if engine_total > 0 else float("inf"),
+        }
+        print(
+            f"{name:>17} 用例 {len(cases)} 失败 {len(failures)} "
+            f"求解 {engine_total:.4f}s 暴力 {oracle_total:.4f}s 加速比 {report['engines'][name]['speed_ratio']:.1f}x",
+            file=sys.stderr
+        )
+
+    return report
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="用暴力枚举作为参照, 对求解器做差分模糊测试")
+    parser.add_argument("--engines", nargs="+", choices=sorted(all_checks()), default=list(all_checks()), help="要检查的求解实现与接口")
+    parser.add_argument("--iterations", type=int, default=200, help="随机用例个数")
+    parser.add_argument("--max-amount", type=int, default=40, help="随机物量上限, 暴力枚举为 O(A^3)")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子, 默认随机")
+    parser.add_argument("--output", default=None, help="JSON 报告输出路径")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    report = fuzz(args.engines, iterations=args.iterations, max_amount=args.max_amount, seed=seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+    failed = [name for name, result in report["engines"].items() if result["failures"]]
+    for name in failed:
+        for failure in report["engines"][name]["failures"]:
+            print(f"{name}: 物量 {failure['amount']} 分数 {failure['score']} 不一致, 最小反例 {failure['shrunk']}")
+    print(f"种子 {seed}: " + ("全部通过" if not failed else f"{len(failed)} 个实现存在错误"))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,152 @@
+import sys
+import array
+import collections
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from calculator import DEFAULT_SOLVER, NO_CONSTRAINTS, Constraints, SolutionArray, Solver
+
+# 单个 k' 下的全部等差数列, 按列存放: C, k'', 首个 G, 项数
+Progressions = Tuple[array.array, array.array, array.array, array.array]
+
+# 键 (物量, k') 对应 (等差数列, 解数); 键 (物量, None) 对应该物量无约束时各分数的解数
+Entry = Union[Tuple[Progressions, int], array.array]
+
+
+def progression_columns(progressions: Iterator[Tuple[int, int, int, int]]) -> Progressions:
+    columns = tuple(array.array("I") for _ in range(4))
+    for progression in progressions:
+        for column, value in zip(columns, progression):
+            column.append(value)
+    return columns
+
+
+class ProgressionCache:
+    def __init__(self, solver: Solver = DEFAULT_SOLVER, constraints: Optional[Constraints] = None, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.solver = solver
+        self.constraints = constraints or NO_CONSTRAINTS
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # 按 (物量, k') 缓存等差数列; 每个 k' 只对应一个分数, 相邻分数之间没有可复用的条目,
+        # 因此只有重复的查询与 prefetch 过的查询是快的, 其余查询与直接调用 Solver 的开销相同
+        # 条目大小随物量增长: 每个 k' 约有 A / 9 个 C, 每个数列按列存放占 16 字节, 物量 10000 时一个 k' 约 18 KiB,
+        # 因此与 cache.SolutionCache 一样同时按条目数与近似字节数淘汰
+        # 无约束的数量查询 (拖动分数滑块的常见情形) 在同一物量连续查询时改用 score_table, 扫描一次后每个分数 O(1)
+        self.entries: "collections.OrderedDict[Tuple[int, Optional[int]], Tuple[Entry, int]]" = collections.OrderedDict()
+        self.current_bytes = 0
+        self.counters = collections.Counter()
+        self.amount: Optional[int] = None
+        self.score: Optional[int] = None
+
+    def set_constraints(self, constraints: Optional[Constraints]) -> None:
+        constraints = constraints or NO_CONSTRAINTS
+        if constraints != self.constraints:
+            self.constraints = constraints
+            self.clear()
+
+    def lookup(self, key: Tuple[int, Optional[int]]) -> Optional[Entry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return entry[0]
+
+    def remember(self, key: Tuple[int, Optional[int]], entry: Entry, size: int) -> None:
+        if size > self.max_bytes:
+            self.counters["oversized"] += 1
+            return
+
+        self.entries[key] = (entry, size)
+        self.current_bytes += size
+        while len(self.entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.counters["evictions"] += 1
+
+    def progressions(self, A: int, k_p: int) -> Tuple[Progressions, int]:
+        entry = self.lookup((A, k_p))
+        if entry is not None:
+            return entry
+
+        columns = progression_columns(())
+        bounds = self.constraints.bounds(A)
+        if bounds is not None:
+            # C 的下界只是由分数推出的剪枝条件, 用 k' 自身对应的分数计算即可, 不依赖查询时的目标分数
+            S = (2 * self.solver.gcd_123 * k_p + A) // (2 * A)
+            columns = progression_columns(self.solver.iter_progressions(A, S, bounds, k_p_range=range(k_p, k_p + 1)))
+        entry = (columns, sum(columns[3]))
+
+        self.remember((A, k_p), entry, sys.getsizeof(entry) + sum(map(sys.getsizeof, columns)))
+        return entry
+
+    def score_table(self, A: int, build: bool = True) -> Optional[array.array]:
+        if not build and (A, None) not in self.entries:
+            return None
+        table = self.lookup((A, None))
+        if table is None:
+            counts = self.solver.score_table(A)
+            # 每个物量一张 1000001 项的表, 能放进 32 位时只占 4 MiB
+            table = array.array("I" if max(counts) < 1 << 32 else "q", counts)
+            self.remember((A, None), table, sys.getsizeof(table))
+        return table
+
+    def count(self, amount: int, target_score: int) -> int:
+        # 无约束时, 同一物量的第二次查询起扫描一次整张分数表; 只查一次的物量 (拖动物量滑块) 仍逐个 k' 计数
+        if self.constraints == NO_CONSTRAINTS:
+            table = self.score_table(amount, build=amount == self.amount)
+            if table is not None:
+                self.amount, self.score = amount, target_score
+                return table[target_score] if 0 <= target_score < len(table) else 0
+
+        self.amount, self.score = amount, target_score
+        return sum(self.progressions(amount, k_p)[1] for k_p in self.solver.k_p_range(amount, target_score))
+
+    def iter(self, amount: int, target_score: int) -> Iterator[Tuple[int, int, int]]:
+        self.amount, self.score = amount, target_score
+        a1_pp, a2_pp = self.solver.a1_pp, self.solver.a2_pp
+
+        for k_p in self.solver.k_p_range(amount, target_score):
+            for C, k_pp, legal_G_min, count in zip(*self.progressions(amount, k_p)[0]):
+                for G in range(legal_G_min, legal_G_min + count * a1_pp, a1_pp):
+                    yield C, (k_pp - G * a2_pp) // a1_pp, G
+
+    def solve(self, amount: int, target_score: int) -> List[Tuple[int, int, int]]:
+        return list(self.iter(amount, target_score))
+
+    def solve_compact(self, amount: int, target_score: int) -> SolutionArray:
+        self.amount, self.score = amount, target_score
+        a1_pp, a2_pp = self.solver.a1_pp, self.solver.a2_pp
+
+        solutions = SolutionArray()
+        for k_p in self.solver.k_p_range(amount, target_score):
+            for C, k_pp, legal_G_min, count in zip(*self.progressions(amount, k_p)[0]):
+                solutions.extend_progression(C, (k_pp - legal_G_min * a2_pp) // a1_pp, -a2_pp, legal_G_min, a1_pp, count)
+
+        return solutions
+
+    def move(self, score_delta: int = 0, amount_delta: int = 0) -> List[Tuple[int, int, int]]:
+        if self.amount is None:
+            raise ValueError("尚未进行过查询, 无法相对移动")
+        return self.solve(self.amount + amount_delta, self.score + score_delta)
+
+    def prefetch(self, amount: int, target_score: int, score_radius: int = 0, amount_radius: int = 0) -> None:
+        # 缓存只对算过的 k' 有效, 可在空闲时预先算好邻近物量与分数的 k'
+        for A in range(max(1, amount - amount_radius), amount + amount_radius + 1):
+            for k_p in self.solver.k_p_range(A, target_score - score_radius, target_score + score_radius):
+                self.progressions(A, k_p)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "hits": self.counters["hits"],
+            "misses": self.counters["misses"],
+            "evictions": self.counters["evictions"],
+            "oversized": self.counters["oversized"],
+        }
@@ -0,0 +1,137 @@
+import os
+import sys
+import mmap
+import struct
+import argparse
+import concurrent.futures
+from typing import List, Optional, Tuple
+
+from calculator import SCORE_COEFFICIENTS, score_table, ordered_map
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"PHIREACH"
+FORMAT_VERSION = 1
+
+# 文件头: 魔数, 格式版本, 三个计分系数, 最高分, 起始物量, 物量个数, 每个位图的字节数; 之后是每个物量的位图偏移表 (uint64)
+HEADER = struct.Struct("<8sIIIIIIII")
+OFFSET = struct.Struct("<Q")
+
+
+def encode_bitmap(counts: List[int]) -> bytes:
+    # 第 S 位表示分数 S 可达, 字节内低位在前
+    if np is not None:
+        return np.packbits(np.asarray(counts) > 0, bitorder="little").tobytes()
+
+    bitmap = bytearray((len(counts) + 7) // 8)
+    for score, count in enumerate(counts):
+        if count:
+            bitmap[score >> 3] |= 1 << (score & 7)
+    return bytes(bitmap)
+
+
+def build_chunk(amounts: List[int]) -> List[bytes]:
+    return [encode_bitmap(score_table(amount)) for amount in amounts]
+
+
+def build_index(output_path: str, amount_start: int, amount_stop: int, workers: Optional[int] = None, chunk_size: int = 8) -> int:
+    if not 1 <= amount_start <= amount_stop:
+        raise ValueError(f"物量范围不合法: [{amount_start}, {amount_stop}]")
+
+    a1, a2, a3 = SCORE_COEFFICIENTS
+    max_score = a1 + a3
+    amount_count = amount_stop - amount_start + 1
+    bitmap_size = (max_score + 1 + 7) // 8
+    data_start = HEADER.size + amount_count * OFFSET.size
+
+    workers = workers or os.cpu_count() or 1
+    amounts = range(amount_start, amount_stop + 1)
+    chunks = (list(amounts[i:i + chunk_size]) for i in range(0, amount_count, chunk_size))
+
+    # 先写入临时文件再原子替换, 读者不会看到写了一半的索引
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as output:
+        output.write(HEADER.pack(MAGIC, FORMAT_VERSION, a1, a2, a3, max_score, amount_start, amount_count, bitmap_size))
+        output.write(b"".join(OFFSET.pack(data_start + i * bitmap_size) for i in range(amount_count)))
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for bitmaps in ordered_map(executor, build_chunk, chunks, window=2 * workers):
+                output.writelines(bitmaps)
+
+    os.replace(temp_path, output_path)
+    return amount_count
+
+
+class ReachabilityIndex:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, a1, a2, a3, self.max_score, self.amount_start, self.amount_count, self.bitmap_size = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} 不是可识别的可达性索引文件")
+        if (a1, a2, a3) != tuple(SCORE_COEFFICIENTS):
+            self.close()
+            raise ValueError(f"{path} 的计分系数 {(a1, a2, a3)} 与当前 {tuple(SCORE_COEFFICIENTS)} 不一致, 需要重新生成")
+
+        self.amounts = range(self.amount_start, self.amount_start + self.amount_count)
+
+    def offset(self, amount: int) -> int:
+        if amount not in self.amounts:
+            raise KeyError(f"物量 {amount} 不在索引范围 [{self.amounts.start}, {self.amounts.stop - 1}] 内")
+        return OFFSET.unpack_from(self.buffer, HEADER.size + (amount - self.amount_start) * OFFSET.size)[0]
+
+    def reachable(self, amount: int, target_score: int) -> bool:
+        if not 0 <= target_score <= self.max_score:
+            return False
+        return bool(self.buffer[self.offset(amount) + (target_score >> 3)] >> (target_score & 7) & 1)
+
+    def bitmap(self, amount: int) -> bytes:
+        offset = self.offset(amount)
+        return self.buffer[offset:offset + self.bitmap_size]
+
+    def __contains__(self, query: Tuple[int, int]) -> bool:
+        return self.reachable(*query)
+
+    def close(self) -> None:
+        self.buffer.close()
+
+    def __enter__(self) -> "ReachabilityIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="生成或查询按物量划分的分数可达性位图索引 (mmap 只读共享)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="生成索引文件")
+    build_parser.add_argument("--amount-start", type=int, default=1, help="起始物量 (含)")
+    build_parser.add_argument("--amount-stop", type=int, required=True, help="结束物量 (含)")
+    build_parser.add_argument("--output", required=True, help="索引文件路径")
+    build_parser.add_argument("--workers", type=int, default=None, help="进程数, 默认为 CPU 核数")
+    build_parser.add_argument("--chunk-size", type=int, default=8, help="每个任务包含的物量个数")
+
+    query_parser = subparsers.add_parser("query", help="查询某物量下某分数是否可达")
+    query_parser.add_argument("index", help="索引文件路径")
+    query_parser.add_argument("amount", type=int, help="物量")
+    query_parser.add_argument("score", type=int, help="分数")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        amount_count = build_index(args.output, args.amount_start, args.amount_stop, workers=args.workers, chunk_size=args.chunk_size)
+        print(f"已写入 {amount_count} 个物量的可达性位图到 {args.output}", file=sys.stderr)
+    else:
+        with ReachabilityIndex(args.index) as index:
+            print("可达" if index.reachable(args.amount, args.score) else "不可达")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import ast
+import json
+import hashlib
+import argparse
+import subprocess
+import concurrent.futures
+from typing import Dict, List, Optional, Set
+
+SCENE_FILE = "video.py"
+BASE_SCENE = "PhigrosScoreCalculator"
+MANIFEST_NAME = "sections.json"
+
+# manim 的画质参数与输出目录名
+QUALITIES = {
+    "l": "480p15",
+    "m": "720p30",
+    "h": "1080p60",
+    "p": "1440p60",
+    "k": "2160p60",
+}
+
+
+def load_scene_source(path: str = SCENE_FILE) -> Dict[str, object]:
+    # 只做语法分析, 不导入 video.py, 这样未安装 manim 时也能计算指纹
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+    tree = ast.parse(source)
+
+    sections: List[str] = []
+    methods: Dict[str, str] = {}
+    scenes: Dict[str, str] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "SECTIONS" for target in node.targets):
+            sections = list(ast.literal_eval(node.value))
+        elif isinstance(node, ast.ClassDef) and node.name == BASE_SCENE:
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef):
+                    methods[item.name] = ast.get_source_segment(source, item)
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "section" for target in item.targets):
+                    section = ast.literal_eval(item.value)
+                    if section:
+                        scenes[section] = node.name
+
+    missing = [section for section in sections if section not in scenes]
+    if missing:
+        raise ValueError(f"{path} 中缺少这些节对应的独立场景: {', '.join(missing)}")
+
+    return {"sections": sections, "methods": methods, "scenes": scenes}
+
+
+def method_closure(methods: Dict[str, str], entry: str) -> List[str]:
+    # 从入口方法出发, 收集通过 self.xxx(...) 间接调用到的全部方法
+    seen: Set[str] = set()
+    stack = [entry]
+    while stack:
+        name = stack.pop()
+        if name in seen or name not in methods:
+            continue
+        seen.add(name)
+        stack.extend(re.findall(r"self\.(\w+)\(", methods[name]))
+
+    return sorted(seen)
+
+
+def section_fingerprint(scene_source: Dict[str, object], section: str, quality: str) -> str:
+    methods = scene_source["methods"]
+    digest = hashlib.sha256(quality.encode())
+
+    # __init__ 里是全局的字体、时长等参数, 任何一节都依赖它
+    for name in ["__init__"] + method_closure(methods, section):
+        digest.update(name.encode())
+        digest.update(methods[name].encode())
+        # 节中引用的图片内容变化也需要重新渲染
+        for asset in re.findall(r"[\"']([^\"']+\.(?:jpg|jpeg|png))[\"']", methods[name]):
+            if os.path.exists(asset):
+                with open(asset, "rb") as file:
+                    digest.update(hashlib.sha256(file.read()).digest())
+
+    return digest.hexdigest()
+
+
+def section_output(media_dir: str, scene: str, quality: str) -> str:
+    module = os.path.splitext(os.path.basename(SCENE_FILE))[0]
+    return os.path.join(media_dir, "videos", module, QUALITIES[quality], f"{scene}.mp4")
+
+
+def render_section(scene: str, quality: str, media_dir: str, profile_dir: Optional[str] = None) -> str:
+    command = ["manim", f"-q{quality}", "--media_dir", media_dir, SCENE_FILE, scene]
+    env = None
+    if profile_dir is not None:
+        # 由场景自己在 tear_down 时写出各节的性能报告, 见 scene_profiler.py
+        env = dict(os.environ, PHIGROS_PROFILE=os.path.join(profile_dir, "{scene}.json"))
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=env)
+    return section_output(media_dir, scene, quality)
+
+
+def concatenate(paths: List[str], output_path: str) -> None:
+    # ffmpeg concat demuxer 直接拼接同编码参数的片段, 不重新编码
+    list_path = output_path + ".txt"
+    with open(list_path, "w", encoding="utf-8") as file:
+        for path in paths:
+            file.write(f"file '{os.path.abspath(path)}'\n")
+
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path],
+            check=True
+        )
+    finally:
+        os.remove(list_path)
+
+
+def render(quality: str = "h", workers: Optional[int] = None, media_dir: str = "media", output_path: Optional[str] = None, force: bool = False, profile_dir: Optional[str] = None) -> str:
+    scene_source = load_scene_source()
+    sections, scenes = scene_source["sections"], scene_source["scenes"]
+
+    manifest_path = os.path.join(media_dir, MANIFEST_NAME)
+    manifest: Dict[str, str] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as file:
+            manifest = json.load(file)
+
+    fingerprints = {section: section_fingerprint(scene_source, section, quality) for section in sections}
+    outputs = {section: section_output(media_dir, scenes[section], quality) for section in sections}
+    stale = [
+        section for section in sections
+        if force or manifest.get(f"{quality}:{section}") != fingerprints[section] or not os.path.exists(outputs[section])
+    ]
+
+    for section in sections:
+        print(f"{section:>24} {'渲染' if section in stale else '未变化, 跳过'}", file=sys.stderr)
+
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    # 并行渲染前先统一预编译公式, 避免各节进程各自逐个编译同一批公式
+    if stale:
+        subprocess.run([sys.executable, "texcache.py", SCENE_FILE, "--media-dir", media_dir], check=True)
+
+    # 每节是独立的 manim 进程, 各自占用一个核心
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = {executor.submit(render_section, scenes[section], quality, media_dir, profile_dir): section for section in stale}
+        for future in concurrent.futures.as_completed(futures):
+            section = futures[future]
+            future.result()
+            manifest[f"{quality}:{section}"] = fingerprints[section]
+            with open(manifest_path, "w", encoding="utf-8") as file:
+                json.dump(manifest, file, indent=2)
+
+    output_path = output_path or section_output(media_dir, BASE_SCENE, quality)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    concatenate([outputs[section] for section in sections], output_path)
+
+    return output_path
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="将 video.py 按节拆成独立场景并行渲染, 跳过未修改的节, 最后按顺序拼接为完整视频")
+    parser.add_argument("-q", "--quality", choices=sorted(QUALITIES), default="h", help="画质, 与 manim 的 -q 参数一致, 默认 h (1080p60)")
+    parser.add_argument("--workers", type=int, default=None, help="同时渲染的节数, 默认为 CPU 核数")
+    parser.add_argument("--media-dir", default="media", help="manim 的输出目录")
+    parser.add_argument("--output", default=None, help="拼接后的视频路径, 默认与整场景渲染的输出路径相同")
+    parser.add_argument("--force", action="store_true", help="忽略指纹, 重新渲染全部节")
+    parser.add_argument("--profile", default=None, metavar="DIR", help="为每个渲染的节在该目录下输出性能报告 JSON")
+    args = parser.parse_args(argv)
+
+    output_path = render(args.quality, workers=args.workers, media_dir=args.media_dir, output_path=args.output, force=args.force, profile_dir=args.profile)
+    print(f"已输出 {output_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import functools
+import collections
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import manim
+from manim.mobject.text import tex_mobject
+from manim.utils.tex_file_writing import tex_hash
+
+PROFILE_ENV = "PHIGROS_PROFILE"
+
+
+class SceneProfiler:
+    def __init__(self, scene: manim.Scene) -> None:
+        self.scene = scene
+        self.steps: List[Dict[str, Any]] = []
+        self.stack: List[str] = []
+        self.counters = collections.Counter()
+        self.started_at = time.perf_counter()
+        self.restore: List[Callable[[], None]] = []
+
+    def attach(self) -> "SceneProfiler":
+        scene = self.scene
+
+        # play/wait 与各 display_* 方法替换为带计时的版本, 只作用于当前场景实例
+        scene.play = self.wrap(scene.play, "play", lambda *animations, **_: ", ".join(type(a).__name__ for a in animations))
+        scene.wait = self.wrap(scene.wait, "wait", lambda duration=manim.DEFAULT_WAIT_TIME, *_, **__: f"{duration}s")
+        for name in dir(type(scene)):
+            if name.startswith("display_"):
+                setattr(scene, name, self.wrap(getattr(scene, name), name))
+
+        # 动画片段缓存: renderer 在每次 play/wait 前询问 file_writer 是否已有该片段
+        file_writer = scene.renderer.file_writer
+        is_already_cached = file_writer.is_already_cached
+
+        def counted_is_already_cached(hash_invocation: str) -> bool:
+            cached = is_already_cached(hash_invocation)
+            self.counters["animation_cache_hits" if cached else "animation_cache_misses"] += 1
+            return cached
+
+        file_writer.is_already_cached = counted_is_already_cached
+        self.restore.append(lambda: setattr(file_writer, "is_already_cached", is_already_cached))
+
+        # 公式缓存: 与 manim 相同地按 TeX 源码哈希判断 SVG 是否已存在, 并记录取得 SVG 的耗时
+        tex_to_svg_file = tex_mobject.tex_to_svg_file
+
+        def counted_tex_to_svg_file(expression: str, environment: Optional[str] = None, tex_template: Optional[manim.TexTemplate] = None) -> Path:
+            template = tex_template or manim.config.tex_template
+            if environment is not None:
+                code = template.get_texcode_for_expression_in_env(expression, environment)
+            else:
+                code = template.get_texcode_for_expression(expression)
+            cached = (Path(manim.config.get_dir("tex_dir")) / f"{tex_hash(code)}.svg").exists()
+
+            start_time = time.perf_counter()
+            result = tex_to_svg_file(expression, environment=environment, tex_template=tex_template)
+            self.counters["tex_cache_hits" if cached else "tex_cache_misses"] += 1
+            self.counters["tex_ms"] += round((time.perf_counter() - start_time) * 1000)
+            return result
+
+        tex_mobject.tex_to_svg_file = counted_tex_to_svg_file
+        self.restore.append(lambda: setattr(tex_mobject, "tex_to_svg_file", tex_to_svg_file))
+
+        return self
+
+    def wrap(self, method: Callable, kind: str, describe: Optional[Callable[..., str]] = None) -> Callable:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            renderer = self.scene.renderer
+            counters_before = self.counters.copy()
+            time_before = renderer.time
+            parent = "/".join(self.stack)
+
+            self.stack.append(kind)
+            start_time = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                wall_time = time.perf_counter() - start_time
+                self.stack.pop()
+
+                step = {
+                    "kind": kind,
+                    "detail": describe(*args, **kwargs) if describe else "",
+                    "parent": parent,
+                    "wall_s": wall_time,
+                    "frames": round((renderer.time - time_before) * manim.config.frame_rate),
+                    "mobjects": len(self.scene.mobjects),
+                    "family_members": len(self.scene.get_mobject_family_members()),
+                }
+                step.update((name, self.counters[name] - counters_before[name]) for name in (
+                    "animation_cache_hits", "animation_cache_misses", "tex_cache_hits", "tex_cache_misses", "tex_ms"
+                ))
+                self.steps.append(step)
+
+        return wrapper
+
+    def detach(self) -> None:
+        while self.restore:
+            self.restore.pop()()
+
+    def report(self) -> Dict[str, Any]:
+        # display_* 之间互相嵌套, 总耗时只累加最外层
+        sections = [step for step in self.steps if step["kind"].startswith("display_") and not step["parent"]]
+        return {
+            "total_s": time.perf_counter() - self.started_at,
+            "sections_s": sum(step["wall_s"] for step in sections),
+            # manim 的 wait 内部也会调用 play, 只统计最外层的 play/wait
+            "frames": sum(step["frames"] for step in self.steps if step["kind"] in ("play", "wait") and not step["parent"].endswith(("play", "wait"))),
+            "counters": dict(self.counters),
+            "steps": sorted(self.steps, key=lambda step: step["wall_s"], reverse=True),
+        }
+
+    def write_report(self, path: str, top: int = 20) -> Dict[str, Any]:
+        report = self.report()
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+        print(f"渲染总耗时 {report['total_s']:.2f}s, 共 {report['frames']} 帧, 耗时最多的 {top} 步:", file=sys.stderr)
+        for step in report["steps"][:top]:
+            name = f"{step['parent'] + '/' if step['parent'] else ''}{step['kind']}"
+            print(
+                f"{step['wall_s']:9.3f}s {step['frames']:6d} 帧 物体 {step['family_members']:5d} "
+                f"片段缓存 {step['animation_cache_hits']}/{step['animation_cache_hits'] + step['animation_cache_misses']} "
+                f"公式编译 {step['tex_cache_misses']} ({step['tex_ms']}ms)  {name} {step['detail']}",
+                file=sys.stderr
+            )
+
+        return report
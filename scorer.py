@@ -0,0 +1,54 @@
+import itertools
+from typing import List, Optional, Sequence, Tuple, Union
+
+from calculator import SCORE_COEFFICIENTS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def calculate_score(C: int, P: int, G: int, A: int, coefficients: Tuple[int, int, int] = SCORE_COEFFICIENTS) -> int:
+    # round((a1 P + a2 G + a3 C) / A), 0.5 进位, 全程整数运算
+    a1, a2, a3 = coefficients
+    return (2 * (a1 * P + a2 * G + a3 * C) + A) // (2 * A)
+
+
+def calculate_accuracy(P: int, G: int, A: int, decimals: int = 2, coefficients: Tuple[int, int, int] = SCORE_COEFFICIENTS) -> float:
+    # (P + 0.65G) / A 的百分数, 保留 decimals 位小数, 0.5 进位
+    a1, a2, _ = coefficients
+    scale = 100 * 10 ** decimals
+    return (2 * scale * (a1 * P + a2 * G) + a1 * A) // (2 * a1 * A) / 10 ** decimals
+
+
+def calculate_scores(
+    C: Sequence[int], P: Sequence[int], G: Sequence[int], A: Union[int, Sequence[int]],
+    coefficients: Tuple[int, int, int] = SCORE_COEFFICIENTS, use_numpy: Optional[bool] = None
+) -> Sequence[int]:
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError("calculate_scores(use_numpy=True) 需要安装 NumPy")
+
+    if use_numpy:
+        return calculate_scores_numpy(C, P, G, A, coefficients)
+    return calculate_scores_python(C, P, G, A, coefficients)
+
+
+def calculate_scores_python(
+    C: Sequence[int], P: Sequence[int], G: Sequence[int], A: Union[int, Sequence[int]],
+    coefficients: Tuple[int, int, int] = SCORE_COEFFICIENTS
+) -> List[int]:
+    a1, a2, a3 = coefficients
+    amounts = itertools.repeat(A) if isinstance(A, int) else A
+    return [(2 * (a1 * p + a2 * g + a3 * c) + a) // (2 * a) for c, p, g, a in zip(C, P, G, amounts)]
+
+
+def calculate_scores_numpy(
+    C: Sequence[int], P: Sequence[int], G: Sequence[int], A: Union[int, Sequence[int]],
+    coefficients: Tuple[int, int, int] = SCORE_COEFFICIENTS
+) -> "np.ndarray":
+    a1, a2, a3 = coefficients
+    C, P, G, A = (np.asarray(column, dtype=np.int64) for column in (C, P, G, A))
+    return (2 * (a1 * P + a2 * G + a3 * C) + A) // (2 * A)
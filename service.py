@@ -0,0 +1,228 @@
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import itertools
+import collections
+import multiprocessing
+import urllib.parse
+import concurrent.futures
+from typing import Any, Dict, List, Optional, Tuple
+
+from calculator import Constraints, count_solutions, iter_solutions, parse_constraints
+
+MAX_BODY_BYTES = 64 * 1024
+LATENCY_WINDOW = 4096
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def run_query(op: str, amount: int, target_score: int, constraints: Optional[Constraints], limit: Optional[int]) -> Dict[str, Any]:
+    if op == "count":
+        return {"count": count_solutions(amount, target_score, constraints)}
+
+    # 多取一个解才能区分恰好有 limit 个解与被截断
+    solutions = list(itertools.islice(iter_solutions(amount, target_score, constraints), None if limit is None else limit + 1))
+    truncated = limit is not None and len(solutions) > limit
+    if truncated:
+        del solutions[limit:]
+    return {"count": len(solutions), "truncated": truncated, "solutions": solutions}
+
+
+def parse_query(op: str, params: Dict[str, Any]) -> Tuple[str, int, int, Optional[Constraints], Optional[int]]:
+    try:
+        amount = int(params["amount"])
+        target_score = int(params["score"])
+        limit = None if params.get("limit") is None else int(params["limit"])
+        # POST 的约束放在 constraints 对象中, GET 直接作为查询参数
+        fields = params.get("constraints") or {}
+        if not isinstance(fields, dict):
+            raise BadRequest("constraints 必须是 JSON 对象")
+        fields = dict(fields)
+        fields.update((key, params[key]) for key in Constraints._fields if key in params)
+        constraints = parse_constraints(fields) if fields else None
+    except KeyError as error:
+        raise BadRequest(f"缺少参数: {error.args[0]}")
+    except (TypeError, ValueError) as error:
+        raise BadRequest(f"参数不合法: {error}")
+
+    if amount < 1:
+        raise BadRequest("物量必须为正整数")
+    if limit is not None and limit < 0:
+        raise BadRequest("limit 不能为负数")
+
+    return op, amount, target_score, constraints, limit
+
+
+class ScoreService:
+    def __init__(self, executor: Optional[concurrent.futures.Executor] = None, workers: Optional[int] = None) -> None:
+        # 进程池在处理连接时才按需创建子进程, fork 会让子进程继承客户端套接字导致连接无法关闭, 因此使用 spawn
+        self.executor = executor or concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.counters = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.started_at = time.monotonic()
+
+    async def query(self, key: Tuple) -> Dict[str, Any]:
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, run_query, *key)
+        self.in_flight[key] = future
+        self.counters["computations"] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        uptime = time.monotonic() - self.started_at
+
+        def percentile(q: float) -> Optional[float]:
+            return latencies[max(0, math.ceil(q * len(latencies)) - 1)] * 1000 if latencies else None
+
+        return {
+            "uptime_s": uptime,
+            "requests": self.counters["requests"],
+            "computations": self.counters["computations"],
+            "coalesced": self.counters["coalesced"],
+            "errors": self.counters["errors"],
+            "in_flight": len(self.in_flight),
+            "throughput_rps": self.counters["requests"] / uptime if uptime > 0 else 0.0,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+        }
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        url = urllib.parse.urlsplit(target)
+
+        if url.path == "/stats":
+            if method != "GET":
+                raise BadRequest("只支持 GET", 405)
+            return 200, self.stats()
+
+        if url.path not in ("/solve", "/count"):
+            raise BadRequest(f"未知路径: {url.path}", 404)
+
+        if method == "GET":
+            params: Dict[str, Any] = dict(urllib.parse.parse_qsl(url.query))
+        elif method == "POST":
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                raise BadRequest("请求体不是合法的 JSON")
+            if not isinstance(params, dict):
+                raise BadRequest("请求体必须是 JSON 对象")
+        else:
+            raise BadRequest("只支持 GET 与 POST", 405)
+
+        return 200, await self.query(parse_query(url.path[1:], params))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        start_time = time.perf_counter()
+        try:
+            try:
+                method, target, body = await read_request(reader)
+                status, payload = await self.dispatch(method, target, body)
+            except BadRequest as error:
+                status, payload = error.status, {"error": str(error)}
+            except Exception as error:
+                status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+
+            self.counters["requests"] += 1
+            if status != 200:
+                self.counters["errors"] += 1
+            await write_response(writer, status, payload)
+            self.latencies.append(time.perf_counter() - start_time)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise BadRequest("请求行不合法")
+    method, target, _ = request_line
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise BadRequest("Content-Length 不合法")
+    if length < 0:
+        raise BadRequest("Content-Length 不合法")
+    if length > MAX_BODY_BYTES:
+        raise BadRequest("请求体过大", 413)
+    body = await reader.readexactly(length) if length else b""
+
+    return method.upper(), target, body
+
+
+async def write_response(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("latin-1")
+    writer.write(head + body)
+    await writer.drain()
+
+
+async def serve(host: str, port: int, workers: Optional[int]) -> None:
+    service = ScoreService(workers=workers)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"服务已启动: http://{address[0]}:{address[1]}", file=sys.stderr)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="基于 asyncio 的本地分数逆向计算 JSON 服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口, 0 表示随机端口")
+    parser.add_argument("--workers", type=int, default=None, help="求解进程数, 默认为 CPU 核数")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,157 @@
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import functools
+import contextlib
+import concurrent.futures
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from calculator import Constraints, chunked, count_solutions, iter_solutions, ordered_map, parse_constraints, sample_solutions
+
+MODES = ("count", "sample", "solutions")
+
+# 每条查询: (行号, 解析出的字段, 解析错误)
+Query = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def read_queries(lines: Iterable[str], input_format: str = "auto") -> Iterator[Query]:
+    lines = iter(lines)
+    # 跳过开头的空行再判断格式, 行号要加上跳过的行数
+    skipped = 0
+    head = []
+    for line in lines:
+        if line.strip():
+            head.append(line)
+            break
+        skipped += 1
+    if input_format == "auto" and head:
+        input_format = "jsonl" if head[0].lstrip().startswith("{") else "csv"
+    lines = itertools.chain(head, lines)
+
+    if input_format == "jsonl":
+        for line_no, line in enumerate(lines, skipped + 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield line_no, None, f"JSON 解析失败: {error}"
+                continue
+            if isinstance(record, dict):
+                yield line_no, record, None
+            else:
+                yield line_no, None, "每行必须是 JSON 对象"
+    else:
+        # CSV 首个非空行为表头, 必须包含 amount 与 score, 其余列按约束名解析, 空值视为不限制
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num + skipped, {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}, None
+
+
+def parse_query(record: Dict[str, Any]) -> Tuple[int, int, Optional[Constraints]]:
+    amount, target_score = int(record["amount"]), int(record["score"])
+
+    fields = dict(record.get("constraints") or {})
+    fields.update((key, record[key]) for key in Constraints._fields if key in record)
+
+    if amount < 1:
+        raise ValueError("物量必须为正整数")
+    return amount, target_score, parse_constraints(fields) if fields else None
+
+
+def run_query(line_no: int, record: Optional[Dict[str, Any]], error: Optional[str], mode: str, samples: int, seed: Optional[int], time_budget: Optional[float]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"line": line_no}
+    if error is not None:
+        result["error"] = error
+        return result
+
+    try:
+        amount, target_score, constraints = parse_query(record)
+    except (KeyError, TypeError, ValueError) as parse_error:
+        result["error"] = f"查询不合法: {parse_error!r}"
+        return result
+    result.update(amount=amount, score=target_score)
+
+    # count/sample 无法中途停止, 超出预算时保留已算出的结果并标记 timed_out; solutions 超出预算时停止枚举, 只输出已得到的解
+    start_time = time.perf_counter()
+    deadline = None if time_budget is None else start_time + time_budget
+    if mode == "count":
+        result["count"] = count_solutions(amount, target_score, constraints)
+    elif mode == "sample":
+        result["sample"] = sample_solutions(amount, target_score, samples, seed, constraints)
+    else:
+        solutions = []
+        for solution in iter_solutions(amount, target_score, constraints):
+            solutions.append(solution)
+            if deadline is not None and len(solutions) % 4096 == 0 and time.perf_counter() > deadline:
+                result["truncated"] = True
+                break
+        result["count"] = len(solutions)
+        result["solutions"] = solutions
+
+    elapsed_time = time.perf_counter() - start_time
+    if deadline is not None and start_time + elapsed_time > deadline:
+        result["timed_out"] = True
+    result["elapsed_ms"] = elapsed_time * 1000
+
+    return result
+
+
+def run_chunk(queries: List[Query], mode: str, samples: int, seed: Optional[int], time_budget: Optional[float]) -> List[str]:
+    return [
+        json.dumps(run_query(*query, mode, samples, seed, time_budget), ensure_ascii=False, separators=(",", ":")) + "\n"
+        for query in queries
+    ]
+
+
+def stream_queries(lines: Iterable[str], output, input_format: str = "auto", mode: str = "count", samples: int = 1, seed: Optional[int] = None, time_budget: Optional[float] = None, workers: int = 1, chunk_size: int = 64) -> int:
+    if mode not in MODES:
+        raise ValueError(f"未知的查询模式: {mode}")
+
+    task = functools.partial(run_chunk, mode=mode, samples=samples, seed=seed, time_budget=time_budget)
+    chunks = chunked(read_queries(lines, input_format), chunk_size)
+
+    records = 0
+    with contextlib.ExitStack() as stack:
+        if workers > 1:
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers=workers))
+            results = ordered_map(executor, task, chunks, window=2 * workers)
+        else:
+            results = map(task, chunks)
+
+        for result_lines in results:
+            output.writelines(result_lines)
+            output.flush()
+            records += len(result_lines)
+
+    return records
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="逐行读取查询 (JSON Lines 或带表头的 CSV), 逐条输出 JSON Lines 结果")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件, 默认为标准输入")
+    parser.add_argument("--format", choices=("auto", "jsonl", "csv"), default="auto", help="输入格式, 默认按首行自动判断")
+    parser.add_argument("--mode", choices=MODES, default="count", help="输出解的数量、随机抽样或全部解")
+    parser.add_argument("--samples", type=int, default=1, help="sample 模式下每条查询的抽样个数")
+    parser.add_argument("--seed", type=int, default=None, help="sample 模式的随机种子")
+    parser.add_argument(
+        "--time-budget", type=float, default=None,
+        help="每条查询的时间预算 (秒); solutions 模式超时后停止枚举并输出已得到的解 (truncated), count/sample 模式算完后才能判断, 结果照常输出并标记 timed_out"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="进程数, 大于 1 时并行且保持输出顺序")
+    parser.add_argument("--chunk-size", type=int, default=64, help="每个任务包含的查询条数")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        lines = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, encoding="utf-8", newline=""))
+        stream_queries(
+            lines, sys.stdout, input_format=args.format, mode=args.mode, samples=args.samples, seed=args.seed,
+            time_budget=args.time_budget, workers=args.workers, chunk_size=args.chunk_size
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,7 +1,9 @@
+from scorer import calculate_score
+
+
 def calculate(C: int, P: int, G: int, A: int) -> None:
     calc_string = f"900000 * ({P} + 0.65 * {G}) / {A} + 100000 * {C} / {A}"
-    res = eval(calc_string)
-    res = round(res + 1e-7)  # 四舍五入
+    res = calculate_score(C, P, G, A)  # 四舍五入
     print(f"{calc_string} = {res}(四舍五入后)")
 
 if __name__ == "__main__":
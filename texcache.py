@@ -0,0 +1,345 @@
+import os
+import re
+import sys
+import ast
+import json
+import shutil
+import hashlib
+import argparse
+import functools
+import tempfile
+import subprocess
+from pathlib import Path
+from xml.etree import ElementTree
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import manim
+from manim.mobject.text import tex_mobject
+from manim.utils.tex_file_writing import tex_hash, tex_to_svg_file
+
+SCENE_FILE = "video.py"
+TEX_CLASSES = ("MathTex", "Tex")
+
+# 会改变编译源码、但无法静态求值的参数; 出现时跳过该公式, 交给 manim 渲染时自行编译
+TEX_KEYWORDS = ("tex_template", "tex_environment", "arg_separator", "substrings_to_isolate", "tex_to_color_map")
+
+# 记录已验证 "批量编译与逐个编译结果一致" 的工具链指纹, 与 media/sections.json 同放在输出目录下, 清空 Tex 缓存时不会丢失
+VERIFIED_FILE = "texcache.json"
+
+PLACEHOLDER_SVG = "<svg xmlns='http://www.w3.org/2000/svg' width='1' height='1' viewBox='0 0 1 1'><path d='M0 0H1V1H0Z'/></svg>"
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+# (表达式, 环境, 模板), 与 manim 调用 tex_to_svg_file 的参数相同
+Formula = Tuple[str, Optional[str], manim.TexTemplate]
+
+
+def collect_formulas(path: str = SCENE_FILE) -> Tuple[List[Formula], int]:
+    # 静态找出参数全为字面量的 MathTex/Tex, 替换掉 tex_to_svg_file 后实际构造一次, 记录 manim 自己改写后要编译的公式;
+    # 返回公式与构造失败而跳过的调用个数
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+
+    formulas: List[Formula] = []
+    skipped = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        placeholder = Path(work_dir) / "placeholder.svg"
+        placeholder.write_text(PLACEHOLDER_SVG, encoding="utf-8")
+
+        def record(expression: str, environment: Optional[str] = None, tex_template: Optional[manim.TexTemplate] = None) -> Path:
+            formulas.append((expression, environment, tex_template or manim.config.tex_template))
+            return placeholder
+
+        original = tex_mobject.tex_to_svg_file
+        tex_mobject.tex_to_svg_file = record
+        try:
+            for node in ast.walk(tree):
+                call = literal_tex_call(node)
+                if call is None:
+                    continue
+                tex_class, args, kwargs = call
+                try:
+                    tex_class(*args, **kwargs)
+                except Exception:
+                    skipped += 1
+        finally:
+            tex_mobject.tex_to_svg_file = original
+
+    return formulas, skipped
+
+
+def literal_tex_call(node: ast.AST) -> Optional[Tuple[type, List[str], Dict[str, Any]]]:
+    if not isinstance(node, ast.Call) or getattr(node.func, "attr", None) not in TEX_CLASSES:
+        return None
+    if not all(isinstance(arg, ast.Constant) and isinstance(arg.value, str) for arg in node.args):
+        return None
+
+    kwargs = {}
+    for keyword in node.keywords:
+        if isinstance(keyword.value, ast.Constant):
+            kwargs[keyword.arg] = keyword.value.value
+        elif keyword.arg == "tex_template":
+            kwargs[keyword.arg] = resolve_attribute(keyword.value)
+        elif keyword.arg is None or keyword.arg in TEX_KEYWORDS:
+            return None
+        # 颜色、字号等其余参数不影响编译的源码, 直接忽略
+
+    return getattr(manim, node.func.attr), [arg.value for arg in node.args], kwargs
+
+
+def resolve_attribute(node: ast.AST) -> object:
+    # 把 manim.TexTemplateLibrary.ctex 这样的属性链解析为实际对象
+    names = []
+    while isinstance(node, ast.Attribute):
+        names.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name) or node.id != "manim":
+        raise ValueError("只支持 manim.xxx 形式的 tex_template")
+
+    value = manim
+    for name in reversed(names):
+        value = getattr(value, name)
+    return value
+
+
+def texcode(expression: str, environment: Optional[str], tex_template: manim.TexTemplate) -> str:
+    # 与 manim 的 tex_to_svg_file 生成源码的方式相同
+    if environment is None:
+        return tex_template.get_texcode_for_expression(expression)
+    return tex_template.get_texcode_for_expression_in_env(expression, environment)
+
+
+def group_by_template(formulas: Iterable[Formula]) -> Dict[int, Tuple[manim.TexTemplate, Dict[str, Tuple[str, Optional[str]]]]]:
+    # 按模板分组并按缓存文件名去重: {id(模板): (模板, {文件名: (表达式, 环境)})}
+    groups: Dict[int, Tuple[manim.TexTemplate, Dict[str, Tuple[str, Optional[str]]]]] = {}
+    for expression, environment, tex_template in formulas:
+        name = tex_hash(texcode(expression, environment, tex_template))
+        groups.setdefault(id(tex_template), (tex_template, {}))[1][name] = (expression, environment)
+    return groups
+
+
+@functools.lru_cache(maxsize=None)
+def tool_version(command: str) -> str:
+    output = subprocess.run([command, "--version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    return output.splitlines()[0] if output else ""
+
+
+def toolchain_fingerprint(tex_template: manim.TexTemplate) -> str:
+    # 批量编译的结果只取决于 manim 版本、模板与编译工具的版本
+    digest = hashlib.sha256(manim.__version__.encode())
+    digest.update(tex_template.get_texcode_for_expression_in_env("x", "align*").encode())
+    digest.update(tool_version(tex_template.tex_compiler).encode())
+    digest.update(tool_version("dvisvgm").encode())
+    return digest.hexdigest()
+
+
+def verified_path() -> Path:
+    return Path(manim.config.media_dir) / VERIFIED_FILE
+
+
+def load_verified() -> Set[str]:
+    path = verified_path()
+    if not path.exists():
+        return set()
+    with open(path, encoding="utf-8") as file:
+        return set(json.load(file).get("fingerprints", []))
+
+
+def precompile(path: str = SCENE_FILE, media_dir: Optional[str] = None) -> Dict[str, int]:
+    if media_dir is not None:
+        manim.config.media_dir = media_dir
+    tex_dir = Path(manim.config.get_dir("tex_dir"))
+    tex_dir.mkdir(parents=True, exist_ok=True)
+
+    # 缓存中已有 SVG 的公式直接跳过, 与 manim 的 tex_to_svg_file 判断方式相同
+    formulas, skipped = collect_formulas(path)
+    groups = group_by_template(formulas)
+    total = sum(len(entries) for _, entries in groups.values())
+    missing = {
+        key: (tex_template, {name: entry for name, entry in entries.items() if not (tex_dir / f"{name}.svg").exists()})
+        for key, (tex_template, entries) in groups.items()
+    }
+    pending = sum(len(entries) for _, entries in missing.values())
+    result = {"formulas": total, "cached": total - pending, "compiled": 0, "unverified": 0, "skipped": skipped}
+    if not pending:
+        return result
+
+    # 只有在本机验证过与逐个编译结果一致的工具链才写入 manim 的缓存, 否则交给 manim 自己逐个编译, 避免缓存被错误结果污染
+    verified = load_verified()
+    for tex_template, entries in missing.values():
+        if not entries:
+            continue
+        if toolchain_fingerprint(tex_template) not in verified:
+            result["unverified"] += len(entries)
+            continue
+        codes = {name: texcode(expression, environment, tex_template) for name, (expression, environment) in entries.items()}
+        result["compiled"] += compile_batch(tex_template, codes, tex_dir)
+
+    return result
+
+
+def verify(path: str = SCENE_FILE, media_dir: Optional[str] = None) -> Dict[str, int]:
+    # 场景中的每个公式各用 manim 逐个编译与批量编译一次, 字形与相对位置全部一致的模板才记为已验证;
+    # 缓存中缺失的公式由 manim 直接编译进 Tex 缓存, 验证结束时缓存也已完整, 已缓存的公式另行编译到临时目录作为参照
+    if media_dir is not None:
+        manim.config.media_dir = media_dir
+    tex_dir = Path(manim.config.get_dir("tex_dir"))
+    tex_dir.mkdir(parents=True, exist_ok=True)
+
+    formulas, _ = collect_formulas(path)
+    verified = load_verified()
+    result = {"formulas": 0, "compiled": 0, "mismatched": 0, "templates": 0, "verified_templates": 0}
+    for tex_template, entries in group_by_template(formulas).values():
+        result["formulas"] += len(entries)
+        result["templates"] += 1
+        with tempfile.TemporaryDirectory() as single_dir, tempfile.TemporaryDirectory() as batch_dir:
+            pages = compile_pages(tex_template, [texcode(expression, environment, tex_template) for expression, environment in entries.values()], Path(batch_dir))
+            if pages is None:
+                result["mismatched"] += len(entries)
+                continue
+
+            cached = {name for name in entries if (tex_dir / f"{name}.svg").exists()}
+            result["compiled"] += len(entries) - len(cached)
+
+            singles = {}
+            original_tex_dir = manim.config.tex_dir
+            for target_dir, names in ((original_tex_dir, set(entries) - cached), (single_dir, cached)):
+                manim.config.tex_dir = target_dir
+                try:
+                    singles.update((name, tex_to_svg_file(entries[name][0], environment=entries[name][1], tex_template=tex_template)) for name in names)
+                finally:
+                    manim.config.tex_dir = original_tex_dir
+
+            mismatched = sum(not same_geometry(svg_geometry(singles[name]), svg_geometry(page)) for name, page in zip(entries, pages))
+        result["mismatched"] += mismatched
+        if not mismatched:
+            verified.add(toolchain_fingerprint(tex_template))
+            result["verified_templates"] += 1
+
+    verified_path().parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(verified_path(), json.dumps({"fingerprints": sorted(verified)}, indent=2).encode("utf-8"))
+    return result
+
+
+def svg_geometry(path: Path) -> Tuple[List[Tuple[str, float, float, float, float]], List[str]]:
+    # dvisvgm 把字形定义在 defs 中, 正文是按页面坐标放置的 use 与 rect; 换成相对左上角的位置后与公式所在的文档无关
+    # 未定义为字形的路径带有绝对坐标, 原样比较
+    root = ElementTree.parse(path).getroot()
+    glyphs = {element.get("id"): element.get("d") for element in root.iter(SVG_NAMESPACE + "path") if element.get("id")}
+
+    shapes = []
+    loose = []
+    for element in root.iter():
+        if element.tag == SVG_NAMESPACE + "use":
+            href = (element.get(XLINK_HREF) or element.get("href") or "").lstrip("#")
+            # dvisvgm 对空白字形只输出 use 而没有定义, 按无笔画处理
+            shapes.append((glyphs.get(href, ""), float(element.get("x", 0)), float(element.get("y", 0)), 0.0, 0.0))
+        elif element.tag == SVG_NAMESPACE + "rect":
+            shapes.append(("rect", float(element.get("x", 0)), float(element.get("y", 0)), float(element.get("width", 0)), float(element.get("height", 0))))
+        elif element.tag == SVG_NAMESPACE + "path" and not element.get("id"):
+            loose.append(element.get("d"))
+
+    if shapes:
+        x0 = min(shape[1] for shape in shapes)
+        y0 = min(shape[2] for shape in shapes)
+        shapes = [(kind, x - x0, y - y0, width, height) for kind, x, y, width, height in shapes]
+    return shapes, loose
+
+
+def same_geometry(a: Tuple[List[Tuple[str, float, float, float, float]], List[str]], b: Tuple[List[Tuple[str, float, float, float, float]], List[str]], tolerance: float = 1e-3) -> bool:
+    (shapes_a, loose_a), (shapes_b, loose_b) = a, b
+    if loose_a != loose_b or len(shapes_a) != len(shapes_b):
+        return False
+    return all(
+        shape_a[0] == shape_b[0] and all(abs(x - y) <= tolerance for x, y in zip(shape_a[1:], shape_b[1:]))
+        for shape_a, shape_b in zip(shapes_a, shapes_b)
+    )
+
+
+def compile_batch(tex_template: manim.TexTemplate, codes: Dict[str, str], tex_dir: Path) -> int:
+    if not codes:
+        return 0
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        pages = compile_pages(tex_template, list(codes.values()), Path(work_dir))
+        if pages is not None:
+            for (name, code), page in zip(codes.items(), pages):
+                write_atomic(tex_dir / f"{name}.tex", code.encode("utf-8"))
+                write_atomic(tex_dir / f"{name}.svg", page.read_bytes())
+            return len(codes)
+
+    # 同一批中只要有一个公式出错整批都会失败, 对半拆分后重试, 最终只剩出错的公式交给 manim 自己报错
+    if len(codes) == 1:
+        return 0
+    items = list(codes.items())
+    middle = len(items) // 2
+    return compile_batch(tex_template, dict(items[:middle]), tex_dir) + compile_batch(tex_template, dict(items[middle:]), tex_dir)
+
+
+def compile_pages(tex_template: manim.TexTemplate, codes: List[str], work_dir: Path) -> Optional[List[Path]]:
+    # 所有公式共用模板的导言区, 每个公式的正文单独成页, dvisvgm 按页输出并把字形转为路径;
+    # 页面版式与 standalone 不同, 只有 verify 确认过的工具链才会使用其结果
+    bodies = [code[code.index(r"\begin{document}") + len(r"\begin{document}"):code.rindex(r"\end{document}")] for code in codes]
+    preamble = codes[0][:codes[0].index(r"\begin{document}")]
+    preamble = re.sub(r"\\documentclass(\[[^\]]*\])?\{standalone\}", r"\\documentclass{article}", preamble, count=1)
+    document = preamble + "\\pagestyle{empty}\n\\begin{document}\n" + "\n\\clearpage\n".join(bodies) + "\n\\end{document}\n"
+
+    tex_file = work_dir / "batch.tex"
+    tex_file.write_text(document, encoding="utf-8")
+
+    output_format = tex_template.output_format
+    command = [tex_template.tex_compiler, "-interaction=batchmode", "-halt-on-error", f"-output-directory={work_dir}", str(tex_file)]
+    if output_format == ".xdv":
+        command.insert(1, "-no-pdf")
+    if subprocess.run(command, cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+        return None
+
+    command = ["dvisvgm", "--page=1-", "--no-fonts", "--verbosity=0", f"--output={work_dir / 'page-%p'}", str(tex_file.with_suffix(output_format))]
+    if output_format == ".pdf":
+        command.insert(1, "--pdf")
+    if subprocess.run(command, cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+        return None
+
+    pages = sorted(work_dir.glob("page-*.svg"), key=lambda page: int(re.search(r"(\d+)\.svg$", page.name).group(1)))
+    return pages if len(pages) == len(codes) else None
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    temp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="把场景中的全部 MathTex 公式合并为少数几次 LaTeX 编译, 预先填充 manim 的 Tex 缓存")
+    parser.add_argument("scene", nargs="?", default=SCENE_FILE, help="场景源码文件")
+    parser.add_argument("--media-dir", default="media", help="manim 的输出目录, 缓存位于其中的 Tex 子目录")
+    parser.add_argument("--verify", action="store_true", help="逐个编译与批量编译全部公式并比较结果, 一致时在本机启用批量预编译; 逐个编译的结果同时写入 Tex 缓存")
+    args = parser.parse_args(argv)
+
+    if shutil.which("dvisvgm") is None:
+        print("未找到 dvisvgm, 无法预编译公式", file=sys.stderr)
+        sys.exit(1)
+
+    if args.verify:
+        result = verify(args.scene, media_dir=args.media_dir)
+        print(
+            f"公式 {result['formulas']} 个, 逐个编译写入缓存 {result['compiled']}, 结果不一致 {result['mismatched']}; "
+            f"模板 {result['templates']} 个, 已验证 {result['verified_templates']}",
+            file=sys.stderr
+        )
+        sys.exit(0 if result["verified_templates"] == result["templates"] else 1)
+
+    result = precompile(args.scene, media_dir=args.media_dir)
+    print(
+        f"公式 {result['formulas']} 个, 已缓存 {result['cached']}, 本次编译 {result['compiled']}, "
+        f"未验证而交给 manim 编译 {result['unverified']}, 构造失败跳过的调用 {result['skipped']}",
+        file=sys.stderr
+    )
+    if result["unverified"]:
+        print("批量编译的结果尚未在本机与逐个编译比对过, 运行 python texcache.py --verify 后启用", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,18 @@
+import os
 import manim
+import texcache
+import scene_profiler
 from typing import Optional
 
+# 各节互不依赖: 每节开始时自行设置所需状态, 结束时清空画面, 因此可以拆成独立场景并行渲染后按顺序拼接
+SECTIONS = (
+    "display_title",
+    "display_chat_history",
+    "display_section_1",
+    "display_section_2",
+    "display_section_3",
+)
+
 class PhigrosScoreCalculator(manim.Scene):
     def __init__(self) -> None:
         super().__init__()
@@ -24,12 +36,22 @@ class PhigrosScoreCalculator(manim.Scene):
 
         self.formula_font_size = 32
 
+    def setup(self) -> None:
+        # 设置环境变量 PHIGROS_PROFILE=报告路径 (可含 {scene}) 时, 记录每节及每次 play/wait 的耗时、帧数、物体数与缓存命中
+        self.profiler = scene_profiler.SceneProfiler(self).attach() if os.environ.get(scene_profiler.PROFILE_ENV) else None
+
+        # 渲染前把全部公式合并编译进 Tex 缓存 (需先运行 texcache.py --verify), 缓存完整时不会启动任何 TeX 进程
+        precompile = texcache.precompile if self.profiler is None else self.profiler.wrap(texcache.precompile, "tex_precompile")
+        precompile(__file__)
+
+    def tear_down(self) -> None:
+        if self.profiler is not None:
+            self.profiler.detach()
+            self.profiler.write_report(os.environ[scene_profiler.PROFILE_ENV].format(scene=type(self).__name__))
+
     def construct(self) -> None:
-        self.display_title()
-        self.display_chat_history()
-        self.display_section_1()
-        self.display_section_2()
-        self.display_section_3()
+        for section in SECTIONS:
+            getattr(self, section)()
 
     def display_title(self) -> None:
         title = manim.Text(
@@ -699,3 +721,31 @@ class PhigrosScoreCalculator(manim.Scene):
 
         self.play(manim.Transform(gcd_content, result, run_time=1.0))
         self.wait(5.0)
+
+
+class SingleSection:
+    # 不继承 Scene, manim 不会把它当作可渲染的场景; 与 PhigrosScoreCalculator 组合后只渲染 section 指定的一节
+    section: str
+
+    def construct(self) -> None:
+        getattr(self, self.section)()
+
+
+class PhigrosTitle(SingleSection, PhigrosScoreCalculator):
+    section = "display_title"
+
+
+class PhigrosChatHistory(SingleSection, PhigrosScoreCalculator):
+    section = "display_chat_history"
+
+
+class PhigrosSection1(SingleSection, PhigrosScoreCalculator):
+    section = "display_section_1"
+
+
+class PhigrosSection2(SingleSection, PhigrosScoreCalculator):
+    section = "display_section_2"
+
+
+class PhigrosSection3(SingleSection, PhigrosScoreCalculator):
+    section = "display_section_3"